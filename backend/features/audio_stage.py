@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+from uuid import uuid4
+
+from backend.features.ffmpeg_engine import (
+    OUTPUT_AUDIO_ARGS,
+    FFmpegRenderError,
+    probe_media,
+    run_ffmpeg,
+)
+from backend.features.media_store import media_store
+from backend.features.render_cache import RenderCache, link_or_copy
+from backend.features.render_plan import atempo_chain
+from backend.features.render_settings import RenderSettings
+
+logger = logging.getLogger("movie-recap")
+
+AUDIO_CACHE_DIR = Path(tempfile.gettempdir()) / "video_recap_audio_cache"
+AUDIO_CACHE_MAX_BYTES = int(
+    os.getenv("AUDIO_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024))
+)
+
+audio_cache = RenderCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES)
+
+
+def audio_stage_key(input_path: Path, speed: float) -> str:
+    source = media_store.digest_for(input_path)
+    if source is None:
+        # Outside the media store, fall back to the file's identity on disk.
+        stat = input_path.stat()
+        source = f"{input_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    payload = f"{source}|atempo|{speed:.6f}|{' '.join(OUTPUT_AUDIO_ARGS)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def time_stretch_audio(
+    input_path: Path,
+    speed: float,
+    target_path: Path,
+    cancel_event: Optional[threading.Event] = None,
+) -> Path:
+    """Write the source audio time-stretched by ``speed`` to ``target_path``.
+
+    The stretch runs natively in ffmpeg's atempo filter (pitch preserved,
+    chained to cover 0.25-5.0) and the encoded AAC track is cached per
+    source and speed, so re-renders with other video settings reuse it.
+    """
+    key = audio_stage_key(input_path, speed)
+    cached_path = audio_cache.get(key, suffix=".m4a")
+    if cached_path is None:
+        work_path = Path(tempfile.gettempdir()) / f"audio_stage_{uuid4().hex}.m4a"
+        tempo = atempo_chain(speed)
+        try:
+            run_ffmpeg(
+                [
+                    "-i",
+                    str(input_path),
+                    "-vn",
+                    "-map",
+                    "0:a:0",
+                    *(["-af", ",".join(tempo)] if tempo else []),
+                    *OUTPUT_AUDIO_ARGS,
+                    str(work_path),
+                ],
+                cancel_event=cancel_event,
+            )
+            cached_path = audio_cache.put(key, work_path)
+        finally:
+            work_path.unlink(missing_ok=True)
+        logger.info("Audio stage cached x%s for %s", speed, input_path.name)
+    link_or_copy(cached_path, target_path)
+    return target_path
+
+
+@contextmanager
+def staged_audio_track(
+    input_path: Path,
+    output_path: Path,
+    settings: RenderSettings,
+    audio_path: Optional[Path],
+    cancel_event: Optional[threading.Event] = None,
+) -> Iterator[Optional[Path]]:
+    """Yield the audio track a render should mux.
+
+    Uploaded audio is used as-is. Source audio that needs a speed change is
+    time-stretched once (or taken from the cache) into a sibling file that
+    is removed afterwards; otherwise the source audio is left to the render.
+    """
+    if audio_path or abs(settings.audio_speed - 1.0) < 1e-6:
+        yield audio_path
+        return
+
+    staged_path = output_path.with_name(f"{output_path.stem}.audio.m4a")
+    try:
+        if probe_media(input_path).has_audio:
+            try:
+                audio_path = time_stretch_audio(
+                    input_path, settings.audio_speed, staged_path, cancel_event
+                )
+            except FFmpegRenderError:
+                logger.exception("Audio stage failed for %s, stretching in the render", input_path.name)
+        yield audio_path
+    finally:
+        staged_path.unlink(missing_ok=True)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from backend.features.ffmpeg_engine import (
+    OUTPUT_VIDEO_ARGS,
+    ProgressCallback,
+    audio_output_args,
+    run_ffmpeg,
+)
+
+
+# Short GOPs let a later re-export replace only the spans whose captions changed.
+CAPTION_KEYFRAME_SECONDS = 2
+CAPTION_VIDEO_ARGS = [
+    *OUTPUT_VIDEO_ARGS,
+    "-preset",
+    "ultrafast",
+    "-force_key_frames",
+    f"expr:gte(t,n_forced*{CAPTION_KEYFRAME_SECONDS})",
+]
+
+
+class AssStyle(BaseModel):
+    """Caption look, in video pixels (PlayRes matches the video size)."""
+
+    font_name: str
+    font_size: int
+    outline: int = 2
+    margin_x: int = 0
+    margin_top: int = 0
+
+
+class AssEvent(BaseModel):
+    start: float
+    end: float
+    lines: list[str]
+
+
+def ass_timestamp(seconds: float) -> str:
+    centiseconds = int(round(max(0.0, seconds) * 100))
+    hrs, rest = divmod(centiseconds, 360000)
+    mins, rest = divmod(rest, 6000)
+    secs, cs = divmod(rest, 100)
+    return f"{hrs:d}:{mins:02d}:{secs:02d}.{cs:02d}"
+
+
+def escape_ass_text(text: str) -> str:
+    # Braces open override blocks and a backslash starts a tag; keep both literal.
+    text = text.replace("\\", "\\\u2060").replace("{", "\\{").replace("}", "\\}")
+    return " ".join(text.split())
+
+
+def build_ass(events: list[AssEvent], width: int, height: int, style: AssStyle) -> str:
+    """Render events as an ASS script with one top-centred style.
+
+    Lines are wrapped by the caller (WrapStyle 2 disables libass wrapping) so
+    both caption engines break text at the same graphemes.
+    """
+    header = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 2",
+        "ScaledBorderAndShadow: yes",
+        "YCbCr Matrix: TV.709",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+        "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+        "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        (
+            f"Style: Caption,{style.font_name},{style.font_size},&H00FFFFFF,&H00FFFFFF,"
+            f"&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,{style.outline},0,8,"
+            f"{style.margin_x},{style.margin_x},{style.margin_top},1"
+        ),
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    dialogue = [
+        f"Dialogue: 0,{ass_timestamp(event.start)},{ass_timestamp(event.end)},Caption,,0,0,0,,"
+        + "\\N".join(escape_ass_text(line) for line in event.lines)
+        for event in events
+    ]
+    return "\n".join(header + dialogue) + "\n"
+
+
+def filter_path(path: Path) -> str:
+    # Quoted for the filtergraph, with ':' escaped for the option parser.
+    return "'" + path.resolve().as_posix().replace(":", "\\:") + "'"
+
+
+def ass_filter(ass_path: Path, fonts_dir: Optional[Path]) -> str:
+    options = [f"filename={filter_path(ass_path)}", "shaping=complex"]
+    if fonts_dir is not None:
+        options.append(f"fontsdir={filter_path(fonts_dir)}")
+    return "ass=" + ":".join(options)
+
+
+def burn_ass_subtitles(
+    video_path: Path,
+    ass_path: Path,
+    fonts_dir: Optional[Path],
+    output_path: Path,
+    duration: float,
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> None:
+    """Burn an ASS script into the video in one ffmpeg pass (libass + HarfBuzz)."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    run_ffmpeg(
+        [
+            "-i",
+            str(video_path),
+            "-map",
+            "0:v:0",
+            "-map",
+            "0:a:0?",
+            "-vf",
+            ass_filter(ass_path, fonts_dir),
+            *CAPTION_VIDEO_ARGS,
+            *audio_output_args(video_path),
+            "-movflags",
+            "+faststart",
+            str(output_path),
+        ],
+        duration=duration,
+        progress_callback=progress_callback,
+        cancel_event=cancel_event,
+    )
+
+
+def mux_subtitle_track(
+    video_path: Path,
+    subtitle_path: Path,
+    output_path: Path,
+    subtitle_codec: str,
+    duration: float,
+    font_path: Optional[Path] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> None:
+    """Add a soft subtitle track; video and audio are stream-copied.
+
+    ``font_path`` is attached to MKV outputs so players render ASS styles with
+    the caption font.
+    """
+    args = [
+        "-i",
+        str(video_path),
+        "-i",
+        str(subtitle_path),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-map",
+        "1:0",
+        "-c:v",
+        "copy",
+        "-c:a",
+        "copy",
+        "-c:s",
+        subtitle_codec,
+        "-disposition:s:0",
+        "default",
+    ]
+    if output_path.suffix.lower() == ".mp4":
+        args += ["-movflags", "+faststart"]
+    elif font_path is not None:
+        args += [
+            "-attach",
+            str(font_path),
+            "-metadata:s:t:0",
+            "mimetype=application/x-truetype-font",
+        ]
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    run_ffmpeg(
+        [*args, str(output_path)],
+        duration=duration,
+        progress_callback=progress_callback,
+        cancel_event=cancel_event,
+    )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+from uuid import uuid4
+
+import numpy as np
+from PIL import Image
+
+from backend.features.render_cache import RenderCache
+
+logger = logging.getLogger("movie-recap")
+
+CAPTION_CACHE_DIR = Path(tempfile.gettempdir()) / "video_recap_caption_cache"
+CAPTION_CACHE_MEMORY_BYTES = int(
+    os.getenv("CAPTION_CACHE_MEMORY_BYTES", str(256 * 1024 * 1024))
+)
+CAPTION_CACHE_DISK_BYTES = int(
+    os.getenv("CAPTION_CACHE_DISK_BYTES", str(1024 * 1024 * 1024))
+)
+# Bump when caption styling (stroke, padding, spacing) changes the raster.
+CAPTION_RASTER_VERSION = 1
+
+
+def caption_raster_key(
+    text: str, max_width: int, font_size: int, font_path: Optional[Path]
+) -> str:
+    font = "default"
+    if font_path is not None:
+        stat = font_path.stat()
+        font = f"{font_path.name}:{stat.st_size}"
+    payload = f"{CAPTION_RASTER_VERSION}|{font}|{font_size}|{max_width}|{text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CaptionRasterCache:
+    """Caption RGBA rasters cached in memory and on disk.
+
+    The memory tier is an LRU bounded by array bytes rather than entry count.
+    The disk tier stores PNGs in a shared ``RenderCache`` directory, so other
+    workers and later processes reuse captions rasterized once. Returned
+    arrays are read-only because they are shared between exports.
+    """
+
+    def __init__(self, disk: RenderCache, max_memory_bytes: int) -> None:
+        self.disk = disk
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._memory_bytes = 0
+
+    def _remember(self, key: str, array: np.ndarray) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = array
+            self._memory_bytes += array.nbytes
+            while self._memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= evicted.nbytes
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            array = self._entries.get(key)
+            if array is not None:
+                self._entries.move_to_end(key)
+                return array
+        path = self.disk.get(key, suffix=".png")
+        if path is None:
+            return None
+        try:
+            with Image.open(path) as image:
+                array = np.array(image.convert("RGBA"))
+        except (OSError, ValueError):
+            logger.warning("Unreadable caption raster in cache: %s", path.name)
+            return None
+        array.flags.writeable = False
+        self._remember(key, array)
+        return array
+
+    def put(self, key: str, array: np.ndarray) -> np.ndarray:
+        array.flags.writeable = False
+        self._remember(key, array)
+        work_path = Path(tempfile.gettempdir()) / f"caption_{uuid4().hex}.png"
+        try:
+            # Captions are mostly transparent; fast deflate keeps writes cheap.
+            Image.fromarray(array).save(work_path, compress_level=1)
+            self.disk.put(key, work_path)
+        except OSError:
+            logger.warning("Failed to persist caption raster %s", key)
+        finally:
+            work_path.unlink(missing_ok=True)
+        return array
+
+    def get_or_render(self, key: str, render: Callable[[], np.ndarray]) -> np.ndarray:
+        array = self.get(key)
+        if array is None:
+            array = self.put(key, render())
+        return array
+
+
+caption_raster_cache = CaptionRasterCache(
+    RenderCache(CAPTION_CACHE_DIR, CAPTION_CACHE_DISK_BYTES), CAPTION_CACHE_MEMORY_BYTES
+)
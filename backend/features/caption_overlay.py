@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import bisect
+from typing import Optional
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+
+class CaptionBitmap(BaseModel):
+    """A caption trimmed to its visible pixels, ready to blend."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    start: float
+    end: float
+    x: int
+    y: int
+    rgb: np.ndarray
+    alpha: np.ndarray
+
+    @classmethod
+    def from_rgba(
+        cls, rgba: np.ndarray, start: float, end: float, x: int, y: int
+    ) -> Optional["CaptionBitmap"]:
+        # Drop the transparent padding so only the text's bounding box is blended.
+        opaque = rgba[:, :, 3] > 0
+        rows = np.flatnonzero(opaque.any(axis=1))
+        cols = np.flatnonzero(opaque.any(axis=0))
+        if rows.size == 0:
+            return None
+        top, bottom = int(rows[0]), int(rows[-1]) + 1
+        left, right = int(cols[0]), int(cols[-1]) + 1
+        box = rgba[top:bottom, left:right]
+        return cls(
+            start=start,
+            end=end,
+            x=x + left,
+            y=y + top,
+            rgb=np.ascontiguousarray(box[:, :, :3]),
+            alpha=np.ascontiguousarray(box[:, :, 3:4]),
+        )
+
+
+class CaptionOverlay:
+    """Caption track indexed by time for per-frame compositing.
+
+    Caption intervals are flattened into sorted, non-overlapping segments that
+    each list the captions visible in them (in draw order). Frames arrive in
+    order when encoding, so a moving cursor finds the segment in amortized
+    O(1); seeks fall back to a binary search.
+    """
+
+    def __init__(self, bitmaps: list[CaptionBitmap]) -> None:
+        self.bitmaps = bitmaps
+        edges = sorted({time for bitmap in bitmaps for time in (bitmap.start, bitmap.end)})
+        self.starts: list[float] = []
+        self.active: list[list[int]] = []
+        for start, end in zip(edges[:-1], edges[1:]):
+            visible = [
+                index
+                for index, bitmap in enumerate(bitmaps)
+                if bitmap.start <= start and end <= bitmap.end
+            ]
+            self.starts.append(start)
+            self.active.append(visible)
+        self.ends = edges[1:]
+        self.cursor = 0
+
+    def segment_at(self, t: float) -> Optional[int]:
+        if not self.starts or t < self.starts[0] or t >= self.ends[-1]:
+            return None
+        cursor = self.cursor
+        if self.starts[cursor] <= t < self.ends[cursor]:
+            return cursor
+        if cursor + 1 < len(self.starts) and self.starts[cursor + 1] <= t < self.ends[cursor + 1]:
+            self.cursor = cursor + 1
+            return self.cursor
+        self.cursor = bisect.bisect_right(self.starts, t) - 1
+        return self.cursor
+
+    def apply(self, frame: np.ndarray, t: float) -> np.ndarray:
+        segment = self.segment_at(t)
+        if segment is None or not self.active[segment]:
+            return frame
+        if not frame.flags.writeable:
+            frame = frame.copy()
+        height, width = frame.shape[:2]
+        for index in self.active[segment]:
+            bitmap = self.bitmaps[index]
+            box_h, box_w = bitmap.alpha.shape[:2]
+            left, top = max(0, bitmap.x), max(0, bitmap.y)
+            right, bottom = min(width, bitmap.x + box_w), min(height, bitmap.y + box_h)
+            if right <= left or bottom <= top:
+                continue
+            src = (slice(top - bitmap.y, bottom - bitmap.y), slice(left - bitmap.x, right - bitmap.x))
+            alpha = bitmap.alpha[src].astype(np.uint16)
+            region = frame[top:bottom, left:right].astype(np.uint16)
+            blended = (bitmap.rgb[src] * alpha + region * (255 - alpha) + 127) // 255
+            frame[top:bottom, left:right] = blended.astype(frame.dtype)
+        return frame
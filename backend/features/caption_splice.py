@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from backend.features.caption_ass import CAPTION_VIDEO_ARGS, AssEvent, ass_filter
+from backend.features.ffmpeg_engine import ProgressCallback, run_ffmpeg
+
+logger = logging.getLogger("movie-recap")
+
+# Past this share of re-encoded time a full burn-in is simpler and as fast.
+MAX_REENCODE_FRACTION = 0.6
+
+
+class SpliceSpan(BaseModel):
+    start: float
+    end: float
+    reencode: bool
+
+
+def changed_ranges(
+    previous: list[AssEvent], current: list[AssEvent]
+) -> list[tuple[float, float]]:
+    """Time ranges whose rendered captions differ between two event lists."""
+
+    def key(event: AssEvent) -> tuple[float, float, tuple[str, ...]]:
+        return round(event.start, 3), round(event.end, 3), tuple(event.lines)
+
+    previous_keys = {key(event) for event in previous}
+    current_keys = {key(event) for event in current}
+    return sorted((start, end) for start, end, _ in previous_keys ^ current_keys)
+
+
+def plan_splice(
+    ranges: list[tuple[float, float]], keyframes: list[float], duration: float
+) -> Optional[list[SpliceSpan]]:
+    """Widen changed ranges to whole GOPs of the previous output.
+
+    Returns alternating copy/re-encode spans covering [0, duration), or None
+    when so much changed that a full render is the better choice.
+    """
+    if duration <= 0 or not keyframes:
+        return None
+    bounds = sorted({0.0, *keyframes} | {duration})
+    bounds = [time for time in bounds if time <= duration]
+
+    dirty: list[tuple[float, float]] = []
+    for start, end in ranges:
+        if end <= 0 or start >= duration:
+            continue
+        first = bounds[max(0, bisect.bisect_right(bounds, max(0.0, start)) - 1)]
+        last = bounds[min(len(bounds) - 1, bisect.bisect_left(bounds, end))]
+        if dirty and first <= dirty[-1][1]:
+            dirty[-1] = (dirty[-1][0], max(dirty[-1][1], last))
+        else:
+            dirty.append((first, last))
+
+    if sum(end - start for start, end in dirty) > duration * MAX_REENCODE_FRACTION:
+        return None
+
+    spans: list[SpliceSpan] = []
+    cursor = 0.0
+    for start, end in dirty:
+        if start > cursor:
+            spans.append(SpliceSpan(start=cursor, end=start, reencode=False))
+        spans.append(SpliceSpan(start=start, end=end, reencode=True))
+        cursor = end
+    if cursor < duration:
+        spans.append(SpliceSpan(start=cursor, end=duration, reencode=False))
+    return spans
+
+
+def splice_caption_render(
+    video_path: Path,
+    previous_output: Path,
+    ass_path: Path,
+    fonts_dir: Optional[Path],
+    output_path: Path,
+    spans: list[SpliceSpan],
+    fps: float,
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> None:
+    """Re-burn only the changed spans and stream-copy the rest.
+
+    Re-encoded spans are cut from the source on the previous output's
+    keyframes, burned with the full ASS script on the original timeline and
+    joined with the untouched GOPs by the concat demuxer. Captions never
+    change the audio, so the previous output's track is copied whole.
+    """
+    reencoded = [span for span in spans if span.reencode]
+    logger.info(
+        "Re-encoding %.1fs in %s span(s) of %s",
+        sum(span.end - span.start for span in reencoded),
+        len(reencoded),
+        previous_output.name,
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix="splice_", dir=output_path.parent))
+    half_frame = 0.5 / max(fps, 1.0)
+    total = sum(span.end - span.start for span in reencoded) or 1.0
+    done = 0.0
+    entries: list[str] = []
+    try:
+        for index, span in enumerate(spans):
+            if not span.reencode:
+                entries.append(
+                    f"file '{previous_output.resolve().as_posix()}'\n"
+                    f"inpoint {span.start:.6f}\noutpoint {span.end:.6f}\n"
+                )
+                continue
+
+            segment_path = work_dir / f"span_{index:03d}.mp4"
+            # Seek half a frame early so the keyframe at span.start is kept and
+            # the frame at span.end (the next GOP's keyframe) is not.
+            seek = max(0.0, span.start - half_frame)
+            length = span.end - span.start
+
+            def report(fraction: float, offset: float = done, length: float = length) -> None:
+                if progress_callback:
+                    progress_callback(min(1.0, (offset + fraction * length) / total) * 0.95)
+
+            run_ffmpeg(
+                [
+                    "-ss",
+                    f"{seek:.6f}",
+                    "-t",
+                    f"{length:.6f}",
+                    "-i",
+                    str(video_path),
+                    "-map",
+                    "0:v:0",
+                    "-an",
+                    "-vf",
+                    f"setpts=round(PTS+{seek:.6f}/TB),{ass_filter(ass_path, fonts_dir)},"
+                    "setpts=PTS-STARTPTS",
+                    # setpts drops the stream rate; keep source timestamps as-is.
+                    "-fps_mode",
+                    "passthrough",
+                    *CAPTION_VIDEO_ARGS,
+                    str(segment_path),
+                ],
+                duration=length,
+                progress_callback=report,
+                cancel_event=cancel_event,
+            )
+            done += length
+            # The last frame's duration is not stored, so state the span length.
+            entries.append(f"file '{segment_path.as_posix()}'\nduration {length:.6f}\n")
+
+        concat_list = work_dir / "spans.txt"
+        concat_list.write_text("".join(entries), encoding="utf-8")
+        run_ffmpeg(
+            [
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(concat_list),
+                "-i",
+                str(previous_output),
+                "-map",
+                "0:v:0",
+                "-map",
+                "1:a:0?",
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                str(output_path),
+            ],
+            cancel_event=cancel_event,
+        )
+        if progress_callback:
+            progress_callback(1.0)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
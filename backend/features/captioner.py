@@ -6,27 +6,53 @@ import os
 import tempfile
 import threading
 import unicodedata
+from enum import Enum
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse, PlainTextResponse
-from moviepy.editor import CompositeVideoClip, ImageClip, VideoFileClip
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+from fastapi.responses import PlainTextResponse
+from moviepy.editor import VideoFileClip
 from pydantic import BaseModel, Field
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
-try:
-    from faster_whisper import WhisperModel
-except Exception:
-    WhisperModel = None
-
-try:
-    import torch
-except Exception:
-    torch = None
+from backend.features.caption_ass import (
+    AssEvent,
+    AssStyle,
+    build_ass,
+    burn_ass_subtitles,
+    mux_subtitle_track,
+)
+from backend.features.caption_cache import caption_raster_cache, caption_raster_key
+from backend.features.caption_overlay import CaptionBitmap, CaptionOverlay
+from backend.features.caption_splice import (
+    SpliceSpan,
+    changed_ranges,
+    plan_splice,
+    splice_caption_render,
+)
+from backend.features.media_serving import serve_file
+from backend.features.ffmpeg_engine import FFmpegRenderError, find_keyframes, probe_media
+from backend.features.media_store import StoredMedia, media_store
+from backend.features.render_settings import RenderEngine
+from backend.features.transcript_cache import (
+    load_transcript,
+    save_transcript,
+    transcript_cache_key,
+)
+from backend.features.transcription_audio import (
+    load_transcription_audio,
+    transcription_audio_key,
+)
+from backend.features.whisper_batching import TranscribeOptions, whisper_scheduler
+from backend.features.whisper_models import (
+    WhisperModelStatus,
+    get_whisper_device,
+    whisper_models,
+)
 
 logger = logging.getLogger("movie-recap")
 
@@ -40,13 +66,23 @@ CAPTION_TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 REPO_FONT_PATH = REPO_ROOT / "Pyidaungsu-1.8.3_Regular.ttf"
+BUNDLED_FONT_PATH = REPO_ROOT / "backend" / "font" / "Pyidaungsu.ttf"
 CAPTION_FONT_PATH = os.getenv("CAPTION_FONT_PATH", str(REPO_FONT_PATH))
 WINDOWS_MYANMAR_FONT = "C:/Windows/Fonts/Pyidaungsu.ttf"
+CAPTION_FONT_SIZE = 40
+CAPTION_PADDING_Y = 14
 
-caption_video_store: Dict[str, Path] = {}
+caption_video_store: Dict[str, StoredMedia] = {}
 caption_job_store: Dict[str, Dict[str, str | int | None]] = {}
 transcribe_job_store: Dict[str, Dict[str, object]] = {}
-whisper_model_cache: Dict[str, "WhisperModel"] = {}
+# Transcript cache key -> job id of the Whisper pass currently producing it.
+transcribe_inflight: Dict[str, str] = {}
+transcribe_inflight_lock = threading.Lock()
+# Last libass burn-in per video: its ASS events and output, for incremental re-export.
+caption_export_history: Dict[str, Dict[str, object]] = {}
+# Per video: the pending cleanup timer and every export output it will delete.
+caption_cleanup_store: Dict[str, Dict[str, object]] = {}
+caption_cleanup_lock = threading.Lock()
 
 
 class CaptionEntry(BaseModel):
@@ -93,9 +129,38 @@ class CaptionTranscribeStatusResponse(BaseModel):
     error: Optional[str] = None
 
 
+class CaptionModelsResponse(BaseModel):
+    budget_bytes: int
+    resident_bytes: int
+    models: list[WhisperModelStatus]
+
+
+class CaptionExportMode(str, Enum):
+    burn = "burn"
+    mov_text = "mov_text"
+    srt = "srt"
+    ass = "ass"
+
+
+# Soft-subtitle modes mux a track instead of re-encoding; MP4 only carries mov_text.
+SOFT_SUBTITLE_SUFFIXES = {
+    CaptionExportMode.mov_text: ".mp4",
+    CaptionExportMode.srt: ".mkv",
+    CaptionExportMode.ass: ".mkv",
+}
+
+
 class CaptionExportRequest(BaseModel):
     video_id: str
     captions: list[CaptionEntry]
+    engine: RenderEngine = Field(
+        RenderEngine.ffmpeg,
+        description="'ffmpeg' burns captions in with libass in one native pass; 'moviepy' composites rendered bitmaps.",
+    )
+    mode: CaptionExportMode = Field(
+        CaptionExportMode.burn,
+        description="'burn' re-encodes with captions in the picture; 'mov_text' (MP4), 'srt' or 'ass' (MKV) add a subtitle track and stream-copy video and audio.",
+    )
 
 
 class CaptionExportResponse(BaseModel):
@@ -126,78 +191,102 @@ class SrtExportRequest(BaseModel):
 def resolve_caption_video(video_id: str) -> Path:
     if video_id not in caption_video_store:
         raise HTTPException(status_code=404, detail="Video not found")
-    video_path = caption_video_store[video_id]
+    video_path = caption_video_store[video_id].path
     if not video_path.exists():
         raise HTTPException(status_code=404, detail="Video file missing")
     return video_path
 
 
-def get_whisper_device() -> str:
-    if torch and torch.cuda.is_available():
-        return "cuda"
-    return "cpu"
-
-
-def load_whisper_model(model_size: str) -> "WhisperModel":
-    if WhisperModel is None:
-        raise HTTPException(
-            status_code=500,
-            detail="faster-whisper is not installed. Please install it.",
-        )
-    device = get_whisper_device()
-    # CPU int8 can degrade transcription quality for Burmese; prefer float32.
-    compute_type = "float16" if device == "cuda" else "float32"
-    cache_key = f"{model_size}:{device}:{compute_type}"
-    if cache_key not in whisper_model_cache:
-        logger.info(
-            "Loading faster-whisper model %s on %s (%s)",
-            model_size,
-            device,
-            compute_type,
-        )
-        whisper_model_cache[cache_key] = WhisperModel(
-            model_size,
-            device=device,
-            compute_type=compute_type,
-        )
-    return whisper_model_cache[cache_key]
-
-
-def cleanup_caption_assets(video_id: str, output_path: Optional[Path] = None) -> None:
-    video_path = caption_video_store.pop(video_id, None)
-    if video_path and video_path.exists():
-        try:
-            video_path.unlink(missing_ok=True)
-        except Exception:
-            logger.warning("Failed to delete temp video: %s", video_path)
-
-    if output_path and output_path.exists():
+def cleanup_caption_assets(video_id: str) -> None:
+    with caption_cleanup_lock:
+        pending = caption_cleanup_store.get(video_id)
+        # A timer that was cancelled after it fired must not clean up.
+        if pending is None or pending["timer"] is not threading.current_thread():
+            return
+        caption_cleanup_store.pop(video_id)
+    stored = caption_video_store.pop(video_id, None)
+    caption_export_history.pop(video_id, None)
+    if stored:
+        media_store.release(stored.sha256)
+
+    for output_path in pending["outputs"]:
+        if not output_path.exists():
+            continue
         try:
             output_path.unlink(missing_ok=True)
         except Exception:
             logger.warning("Failed to delete output: %s", output_path)
 
 
-def schedule_cleanup(
-    video_id: str, output_path: Optional[Path] = None, delay: int = 900
-) -> None:
-    threading.Timer(delay, cleanup_caption_assets, args=(video_id, output_path)).start()
+def hold_caption_assets(video_id: str) -> None:
+    """Keep the video and its earlier outputs while an export uses them."""
+    with caption_cleanup_lock:
+        pending = caption_cleanup_store.setdefault(
+            video_id, {"holds": 0, "timer": None, "outputs": []}
+        )
+        pending["holds"] += 1
+        if pending["timer"] is not None:
+            pending["timer"].cancel()
+            pending["timer"] = None
 
 
-def resolve_font(font_size: int) -> ImageFont.FreeTypeFont:
+def release_caption_assets(
+    video_id: str, output_path: Optional[Path] = None, delay: int = 900
+) -> None:
+    """Drop an export's hold and schedule cleanup once no export holds the video.
+
+    There is one timer per video, pushed back by every export: an earlier
+    output may be the base of the next incremental export, so all outputs are
+    deleted together with the video.
+    """
+    with caption_cleanup_lock:
+        pending = caption_cleanup_store.setdefault(
+            video_id, {"holds": 0, "timer": None, "outputs": []}
+        )
+        pending["holds"] = max(0, pending["holds"] - 1)
+        if output_path and output_path not in pending["outputs"]:
+            pending["outputs"].append(output_path)
+        if pending["holds"]:
+            return
+        timer = threading.Timer(delay, cleanup_caption_assets, args=(video_id,))
+        timer.daemon = True
+        pending["timer"] = timer
+    timer.start()
+
+
+@lru_cache(maxsize=1)
+def resolve_font_path() -> Optional[Path]:
     font_candidates = [
         CAPTION_FONT_PATH,
         str(REPO_FONT_PATH),
+        str(BUNDLED_FONT_PATH),
         WINDOWS_MYANMAR_FONT,
     ]
 
     for font_path in font_candidates:
         if font_path and Path(font_path).exists():
-            return ImageFont.truetype(font_path, font_size)
+            return Path(font_path)
+    return None
+
+
+@lru_cache(maxsize=16)
+def load_font(font_path: Optional[Path], font_size: int) -> ImageFont.FreeTypeFont:
+    # Opening a TrueType file parses its tables; keep one object per (font, size).
+    if font_path is not None:
+        return ImageFont.truetype(str(font_path), font_size)
 
     return ImageFont.load_default()
 
 
+def resolve_font(font_size: int) -> ImageFont.FreeTypeFont:
+    return load_font(resolve_font_path(), font_size)
+
+
+@lru_cache(maxsize=65536)
+def cluster_advance(font_path: Optional[Path], font_size: int, cluster: str) -> float:
+    return load_font(font_path, font_size).getlength(cluster)
+
+
 def split_graphemes(text: str) -> list[str]:
     if not text:
         return [""]
@@ -209,7 +298,8 @@ def split_graphemes(text: str) -> list[str]:
             current = char
             continue
 
-        if unicodedata.combining(char) or char == "\u1039":
+        # Myanmar vowel signs and medials are spacing marks (Mc), not combining.
+        if unicodedata.category(char).startswith("M") or char == "\u1039":
             current += char
             continue
 
@@ -248,17 +338,18 @@ def filter_myanmar_captions(
     return filtered
 
 
-def wrap_text_myanmar(
-    text: str,
-    draw: ImageDraw.ImageDraw,
-    font: ImageFont.FreeTypeFont,
-    max_width: int,
-) -> list[str]:
+def wrap_text_myanmar(text: str, font_size: int, max_width: int) -> list[str]:
+    """Greedy line breaking at grapheme clusters (Myanmar) or words.
+
+    Line width is the running sum of cached token advances, so each token is
+    measured once per font and size instead of re-measuring the whole line.
+    """
     if not text:
         return [""]
 
     words = text.split()
-    if is_myanmar_text(text):
+    myanmar = is_myanmar_text(text)
+    if myanmar:
         tokens: list[str] = []
         for word in words:
             tokens.extend(split_graphemes(word))
@@ -268,16 +359,27 @@ def wrap_text_myanmar(
     else:
         tokens = words if words else list(text)
 
+    font_path = resolve_font_path()
+    space = cluster_advance(font_path, font_size, " ")
     lines: list[str] = []
     current = ""
+    width = 0.0
     for token in tokens:
-        candidate = f"{current}{token}" if token == " " else f"{current} {token}".strip()
-        width = draw.textbbox((0, 0), candidate, font=font)[2]
-        if width <= max_width or not current:
+        advance = cluster_advance(font_path, font_size, token)
+        # Myanmar tokens are grapheme clusters that carry their own spaces.
+        if myanmar or token == " " or not current:
+            candidate = f"{current}{token}"
+            candidate_width = width + advance
+        else:
+            candidate = f"{current} {token}"
+            candidate_width = width + space + advance
+        if candidate_width <= max_width or not current:
             current = candidate
+            width = candidate_width
         else:
             lines.append(current)
             current = token.strip()
+            width = cluster_advance(font_path, font_size, current)
 
     if current:
         lines.append(current)
@@ -285,17 +387,14 @@ def wrap_text_myanmar(
     return lines
 
 
-@lru_cache(maxsize=256)
-def render_caption_array(text: str, max_width: int, font_size: int) -> np.ndarray:
+def rasterize_caption(text: str, max_width: int, font_size: int) -> np.ndarray:
     font = resolve_font(font_size)
-    dummy = Image.new("RGBA", (max_width, 10), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(dummy)
-    lines = wrap_text_myanmar(text, draw, font, max_width)
+    lines = wrap_text_myanmar(text, font_size, max_width)
 
-    line_height = draw.textbbox((0, 0), "Hg", font=font)[3]
+    line_height = font.getbbox("Hg")[3]
     line_spacing = int(font_size * 0.25)
     padding_x = 20
-    padding_y = 14
+    padding_y = CAPTION_PADDING_Y
     height = (
         padding_y * 2
         + len(lines) * line_height
@@ -321,6 +420,13 @@ def render_caption_array(text: str, max_width: int, font_size: int) -> np.ndarra
     return np.array(img)
 
 
+def render_caption_array(text: str, max_width: int, font_size: int) -> np.ndarray:
+    key = caption_raster_key(text, max_width, font_size, resolve_font_path())
+    return caption_raster_cache.get_or_render(
+        key, lambda: rasterize_caption(text, max_width, font_size)
+    )
+
+
 def build_caption_image(text: str, max_width: int, font_size: int = 40) -> Image.Image:
     return Image.fromarray(render_caption_array(text, max_width, font_size))
 
@@ -369,8 +475,201 @@ def normalize_captions(captions: list[CaptionEntry]) -> list[CaptionEntry]:
     return merged
 
 
+def composite_captions_moviepy(
+    job_id: str, video_path: Path, normalized: list[CaptionEntry], output_path: Path
+) -> None:
+    video = VideoFileClip(str(video_path))
+    video_width, video_height = video.size
+
+    caption_bitmaps: list[CaptionBitmap] = []
+    total = len(normalized) if normalized else 1
+    max_text_width = int(video_width * 0.9)
+    caption_top = int(video_height * 0.82)
+
+    for index, caption in enumerate(normalized, start=1):
+        caption_array = render_caption_array(
+            caption.text,
+            max_width=max_text_width,
+            font_size=CAPTION_FONT_SIZE,
+        )
+        bitmap = CaptionBitmap.from_rgba(
+            caption_array,
+            start=caption.start,
+            end=caption.start + max(0.01, caption.end - caption.start),
+            x=(video_width - caption_array.shape[1]) // 2,
+            y=caption_top,
+        )
+        if bitmap is not None:
+            caption_bitmaps.append(bitmap)
+
+        progress = 5 + int((index / total) * 60)
+        caption_job_store[job_id]["progress"] = progress
+
+    overlay = CaptionOverlay(caption_bitmaps)
+    final_video = video.fl(lambda get_frame, t: overlay.apply(get_frame(t), t))
+    caption_job_store[job_id]["progress"] = 75
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    ffmpeg_params = [
+        "-pix_fmt",
+        "yuv420p",
+        "-movflags",
+        "+faststart",
+        "-profile:v",
+        "baseline",
+        "-level",
+        "3.1",
+        "-ac",
+        "2",
+        "-ar",
+        "44100",
+    ]
+    output_fps = getattr(video, "fps", None) or 30
+    final_video.write_videofile(
+        str(output_path),
+        codec="libx264",
+        audio_codec="aac",
+        threads=2,
+        preset="ultrafast",
+        fps=output_fps,
+        ffmpeg_params=ffmpeg_params,
+    )
+    final_video.close()
+    video.close()
+    caption_bitmaps.clear()
+    gc.collect()
+
+
+def write_caption_ass(
+    ass_path: Path, normalized: list[CaptionEntry], width: int, height: int
+) -> list[AssEvent]:
+    font = resolve_font(CAPTION_FONT_SIZE)
+    max_text_width = int(width * 0.9)
+    ascent, descent = font.getmetrics()
+    style = AssStyle(
+        font_name=font.getname()[0],
+        # libass sizes fonts by ascent + descent, PIL by the em square.
+        font_size=ascent + descent,
+        margin_x=(width - max_text_width) // 2,
+        margin_top=int(height * 0.82) + CAPTION_PADDING_Y,
+    )
+    events = [
+        AssEvent(
+            start=caption.start,
+            end=caption.start + max(0.01, caption.end - caption.start),
+            lines=wrap_text_myanmar(caption.text, CAPTION_FONT_SIZE, max_text_width),
+        )
+        for caption in normalized
+    ]
+    ass_path.write_text(build_ass(events, width, height, style), encoding="utf-8")
+    return events
+
+
+def incremental_splice_plan(
+    video_id: str, events: list[AssEvent], duration: float
+) -> Optional[tuple[Path, list[SpliceSpan]]]:
+    previous = caption_export_history.get(video_id)
+    if not previous:
+        return None
+    previous_output = Path(str(previous["output_path"]))
+    if not previous_output.exists():
+        return None
+    ranges = changed_ranges(previous["events"], events)
+    spans = plan_splice(ranges, find_keyframes(previous_output), duration)
+    if spans is None:
+        return None
+    return previous_output, spans
+
+
+def burn_captions_ffmpeg(
+    job_id: str,
+    video_id: str,
+    video_path: Path,
+    normalized: list[CaptionEntry],
+    output_path: Path,
+) -> None:
+    info = probe_media(video_path)
+    font_path = resolve_font_path()
+    fonts_dir = font_path.parent if font_path else None
+    ass_path = CAPTION_TEMP_DIR / f"captions_{job_id}.ass"
+    events = write_caption_ass(ass_path, normalized, info.width, info.height)
+    caption_job_store[job_id]["progress"] = 10
+
+    def report(fraction: float) -> None:
+        caption_job_store[job_id]["progress"] = 10 + int(fraction * 85)
+
+    try:
+        splice = incremental_splice_plan(video_id, events, info.duration)
+        if splice is not None:
+            previous_output, spans = splice
+            try:
+                splice_caption_render(
+                    video_path,
+                    previous_output,
+                    ass_path,
+                    fonts_dir,
+                    output_path,
+                    spans,
+                    fps=info.fps,
+                    progress_callback=report,
+                )
+            except FFmpegRenderError:
+                logger.exception("Incremental caption export failed, re-rendering in full")
+                splice = None
+        if splice is None:
+            burn_ass_subtitles(
+                video_path,
+                ass_path,
+                fonts_dir,
+                output_path,
+                duration=info.duration,
+                progress_callback=report,
+            )
+    finally:
+        ass_path.unlink(missing_ok=True)
+    caption_export_history[video_id] = {"events": events, "output_path": str(output_path)}
+
+
+def mux_captions_soft(
+    job_id: str,
+    video_path: Path,
+    normalized: list[CaptionEntry],
+    output_path: Path,
+    mode: CaptionExportMode,
+) -> None:
+    info = probe_media(video_path)
+    if mode == CaptionExportMode.ass:
+        subtitle_path = CAPTION_TEMP_DIR / f"captions_{job_id}.ass"
+        write_caption_ass(subtitle_path, normalized, info.width, info.height)
+    else:
+        subtitle_path = CAPTION_TEMP_DIR / f"captions_{job_id}.srt"
+        subtitle_path.write_text(build_srt(normalized), encoding="utf-8")
+    caption_job_store[job_id]["progress"] = 10
+
+    def report(fraction: float) -> None:
+        caption_job_store[job_id]["progress"] = 10 + int(fraction * 85)
+
+    try:
+        mux_subtitle_track(
+            video_path,
+            subtitle_path,
+            output_path,
+            subtitle_codec=mode.value,
+            duration=info.duration,
+            font_path=resolve_font_path() if mode == CaptionExportMode.ass else None,
+            progress_callback=report,
+        )
+    finally:
+        subtitle_path.unlink(missing_ok=True)
+
+
 def render_captioned_video(
-    job_id: str, video_id: str, captions: list[CaptionEntry], output_path: Path
+    job_id: str,
+    video_id: str,
+    captions: list[CaptionEntry],
+    output_path: Path,
+    engine: RenderEngine = RenderEngine.ffmpeg,
+    mode: CaptionExportMode = CaptionExportMode.burn,
 ) -> None:
     try:
         caption_job_store[job_id]["status"] = "processing"
@@ -380,72 +679,26 @@ def render_captioned_video(
             raise ValueError("No captions provided")
 
         video_path = resolve_caption_video(video_id)
-        video = VideoFileClip(str(video_path))
-        video_width, video_height = video.size
-
         normalized = normalize_captions(captions)
-        caption_clips: list[ImageClip] = []
-        total = len(normalized) if normalized else 1
-        max_text_width = int(video_width * 0.9)
-
-        for index, caption in enumerate(normalized, start=1):
-            caption_image = build_caption_image(
-                caption.text,
-                max_width=max_text_width,
-                font_size=40,
-            )
-            clip = (
-                ImageClip(np.array(caption_image))
-                .set_start(caption.start)
-                .set_duration(max(0.01, caption.end - caption.start))
-                .set_position(("center", int(video_height * 0.82)))
-            )
-            caption_clips.append(clip)
-
-            progress = 5 + int((index / total) * 60)
-            caption_job_store[job_id]["progress"] = progress
-
-        final_video = CompositeVideoClip([video] + caption_clips, use_bgclip=True)
-        caption_job_store[job_id]["progress"] = 75
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        ffmpeg_params = [
-            "-pix_fmt",
-            "yuv420p",
-            "-movflags",
-            "+faststart",
-            "-profile:v",
-            "baseline",
-            "-level",
-            "3.1",
-            "-ac",
-            "2",
-            "-ar",
-            "44100",
-        ]
-        output_fps = getattr(video, "fps", None) or 30
-        final_video.write_videofile(
-            str(output_path),
-            codec="libx264",
-            audio_codec="aac",
-            threads=2,
-            preset="ultrafast",
-            fps=output_fps,
-            ffmpeg_params=ffmpeg_params,
-        )
-        final_video.close()
-        video.close()
-        for clip in caption_clips:
-            clip.close()
-        caption_clips.clear()
-        gc.collect()
+        if mode != CaptionExportMode.burn:
+            mux_captions_soft(job_id, video_path, normalized, output_path, mode)
+        elif engine == RenderEngine.ffmpeg:
+            try:
+                burn_captions_ffmpeg(job_id, video_id, video_path, normalized, output_path)
+            except FFmpegRenderError:
+                logger.exception(
+                    "FFmpeg caption burn-in failed for %s, falling back to MoviePy",
+                    video_path.name,
+                )
+                caption_job_store[job_id]["progress"] = 5
+                composite_captions_moviepy(job_id, video_path, normalized, output_path)
+        else:
+            composite_captions_moviepy(job_id, video_path, normalized, output_path)
 
         caption_job_store[job_id]["status"] = "completed"
         caption_job_store[job_id]["progress"] = 100
         caption_job_store[job_id]["output_path"] = str(output_path)
         caption_job_store[job_id]["output_url"] = f"/captioner/download/{job_id}"
-
-        schedule_cleanup(video_id, output_path)
     except MemoryError:
         caption_job_store[job_id]["status"] = "failed"
         caption_job_store[job_id]["error"] = "Memory error during export."
@@ -455,6 +708,9 @@ def render_captioned_video(
         caption_job_store[job_id]["status"] = "failed"
         caption_job_store[job_id]["error"] = str(exc)
         caption_job_store[job_id]["progress"] = 0
+    finally:
+        # Releases the hold taken by caption_export; failed outputs go as well.
+        release_caption_assets(video_id, output_path)
 
 
 @router.post("/upload", response_model=CaptionUploadResponse)
@@ -468,29 +724,20 @@ async def caption_upload(video: UploadFile = File(...)):
         )
 
     video_id = uuid4().hex
-    target_path = CAPTION_TEMP_DIR / f"{video_id}_{Path(video.filename).name}"
-    with target_path.open("wb") as buffer:
-        buffer.write(await video.read())
-
-    caption_video_store[video_id] = target_path
+    caption_video_store[video_id] = await media_store.ingest(video)
     return CaptionUploadResponse(video_id=video_id, filename=video.filename)
 
 
-@router.post("/transcribe", response_model=CaptionTranscribeResponse)
-def caption_transcribe(payload: CaptionTranscribeRequest):
-    video_path = resolve_caption_video(payload.video_id)
-
-    try:
-        target_model = payload.model
-        model = load_whisper_model(target_model)
-    except HTTPException:
-        raise
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-
+def transcribe_media(
+    video_path: Path,
+    model_name: str,
+    language: str | None,
+    target_language: str | None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+) -> list[CaptionEntry]:
     device = get_whisper_device()
-    language_hint = None if payload.language in (None, "", "auto") else payload.language
-    target_lang = None if payload.target_language in (None, "", "auto") else payload.target_language
+    language_hint = None if language in (None, "", "auto") else language
+    target_lang = None if target_language in (None, "", "auto") else target_language
     task = "translate" if target_lang == "en" else "transcribe"
 
     initial_prompt = (
@@ -502,16 +749,30 @@ def caption_transcribe(payload: CaptionTranscribeRequest):
     logger.info(
         "Transcribing %s with Whisper %s on %s | lang=%s | target=%s | task=%s",
         video_path.name,
-        payload.model,
+        model_name,
         device,
         language_hint or "auto",
         target_lang or "transcribe",
         task,
     )
-    try:
-        # Burmese-optimized transcription settings
-        segments_iter, info = model.transcribe(
-            str(video_path),
+    audio = load_transcription_audio(video_path)
+    last_log_progress = 0
+
+    def report(fraction: float) -> None:
+        nonlocal last_log_progress
+        if not progress_callback:
+            return
+        progress = min(95, int(fraction * 100))
+        progress_callback(progress)
+        if progress - last_log_progress >= 10:
+            logger.info("Transcribe progress: %s%%", progress)
+            last_log_progress = progress
+
+    # Burmese-optimized transcription settings
+    segments, detected_language = whisper_scheduler.transcribe(
+        model_name,
+        audio,
+        TranscribeOptions(
             language=language_hint,
             task=task,
             initial_prompt=initial_prompt,
@@ -519,45 +780,22 @@ def caption_transcribe(payload: CaptionTranscribeRequest):
             best_of=5,
             patience=1.0,
             word_timestamps=True,
-            vad_filter=True,
-            vad_parameters=dict(
-                min_silence_duration_ms=500,
-                speech_pad_ms=400,
-            ),
-        )
-    except MemoryError as exc:
-        logger.exception("Transcription failed with memory error")
-        raise HTTPException(status_code=507, detail="Out of memory") from exc
-    except Exception as exc:
-        logger.exception("Transcription failed")
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-
-    detected_language = getattr(info, "language", None)
-    language_prob = getattr(info, "language_probability", None)
+            min_silence_duration_ms=500,
+            speech_pad_ms=400,
+        ),
+        progress_callback=report,
+    )
     if detected_language and language_hint and detected_language != language_hint:
         logger.warning("Detected language %s differs from hint %s", detected_language, language_hint)
-    if language_prob is not None:
-        logger.info("Language probability: %s", language_prob)
 
-    segments = list(segments_iter)
     if not segments and language_hint:
         logger.warning("No segments returned. Retrying without language hint...")
-        try:
-            retry_iter, retry_info = model.transcribe(
-                str(video_path),
-                task=task,
-                vad_filter=True,
-            )
-        except MemoryError as exc:
-            logger.exception("Transcription retry failed with memory error")
-            raise HTTPException(status_code=507, detail="Out of memory") from exc
-        except Exception as exc:
-            logger.exception("Transcription retry failed")
-            raise HTTPException(status_code=500, detail=str(exc)) from exc
-        detected_language = getattr(retry_info, "language", None)
+        segments, detected_language = whisper_scheduler.transcribe(
+            model_name, audio, TranscribeOptions(task=task)
+        )
         if detected_language:
             logger.warning("Retry detected language: %s", detected_language)
-        segments = list(retry_iter)
+
     captions = [
         CaptionEntry(
             id=f"cap-{index+1}",
@@ -578,121 +816,139 @@ def caption_transcribe(payload: CaptionTranscribeRequest):
         logger.info("Transcription completed: %s raw, %s kept", raw_count, len(captions))
     else:
         logger.info("Transcription completed: %s raw", raw_count)
-
-    return CaptionTranscribeResponse(
-        video_id=payload.video_id, captions=captions, device=device
-    )
+    return captions
 
 
 def transcribe_with_progress(
     job_id: str,
+    cache_key: str,
     video_path: Path,
     model_name: str,
-    device: str,
     language: str | None,
     target_language: str | None,
 ) -> None:
-    try:
-        model = load_whisper_model(model_name)
-        language_hint = None if language in (None, "", "auto") else language
-        target_lang = None if target_language in (None, "", "auto") else target_language
-        task = "translate" if target_lang == "en" else "transcribe"
-
-        initial_prompt = (
-            "မြန်မာစကားပြောကို မြန်မာစာသားအဖြစ် ပြန်ဆိုပေးပါ။"
-            if language_hint == "my"
-            else None
-        )
+    job = transcribe_job_store[job_id]
 
-        # Burmese-optimized transcription settings
-        segments_iter, info = model.transcribe(
-            str(video_path),
-            language=language_hint,
-            task=task,
-            initial_prompt=initial_prompt,
-            beam_size=5,
-            best_of=5,
-            patience=1.0,
-            word_timestamps=True,
-            vad_filter=True,
-            vad_parameters=dict(
-                min_silence_duration_ms=500,
-                speech_pad_ms=400,
-            ),
-        )
+    def report(progress: int) -> None:
+        job["progress"] = progress
 
-        duration = getattr(info, "duration", None)
-        transcribe_job_store[job_id]["status"] = "processing"
-        transcribe_job_store[job_id]["progress"] = 5
-
-        segments = []
-        last_log_progress = 0
-        for segment in segments_iter:
-            segments.append(segment)
-            if duration:
-                progress = min(95, int((float(segment.end) / float(duration)) * 100))
-                transcribe_job_store[job_id]["progress"] = progress
-                if progress - last_log_progress >= 10:
-                    logger.info("Transcribe progress: %s%%", progress)
-                    last_log_progress = progress
-
-        captions = [
-            CaptionEntry(
-                id=f"cap-{index+1}",
-                start=float(segment.start),
-                end=float(segment.end),
-                text=str(segment.text).strip(),
-            )
-            for index, segment in enumerate(segments)
-        ]
-
-        raw_count = len(captions)
-        filtered = filter_myanmar_captions(captions, threshold=0.1)
-        if filtered and (language_hint in (None, "my", "auto")):
-            captions = filtered
-            logger.info("Transcription completed: %s raw, %s kept", raw_count, len(captions))
-        else:
-            logger.info("Transcription completed: %s raw", raw_count)
+    try:
+        job["status"] = "processing"
+        job["progress"] = 5
+        captions = transcribe_media(
+            video_path, model_name, language, target_language, progress_callback=report
+        )
+        save_transcript(cache_key, [caption.model_dump() for caption in captions])
 
-        transcribe_job_store[job_id]["status"] = "completed"
-        transcribe_job_store[job_id]["progress"] = 100
-        transcribe_job_store[job_id]["captions"] = captions
+        job["status"] = "completed"
+        job["progress"] = 100
+        job["captions"] = captions
     except MemoryError:
         logger.exception("Transcription failed with memory error")
-        transcribe_job_store[job_id]["status"] = "failed"
-        transcribe_job_store[job_id]["error"] = "Out of memory"
-        transcribe_job_store[job_id]["progress"] = 0
+        job["status"] = "failed"
+        job["error"] = "Out of memory"
+        job["status_code"] = 507
+        job["progress"] = 0
+    except HTTPException as exc:
+        job["status"] = "failed"
+        job["error"] = str(exc.detail)
+        job["status_code"] = exc.status_code
+        job["progress"] = 0
     except Exception as exc:
         logger.exception("Transcription failed")
-        transcribe_job_store[job_id]["status"] = "failed"
-        transcribe_job_store[job_id]["error"] = str(exc)
-        transcribe_job_store[job_id]["progress"] = 0
+        job["status"] = "failed"
+        job["error"] = str(exc)
+        job["status_code"] = 500
+        job["progress"] = 0
+    finally:
+        with transcribe_inflight_lock:
+            if transcribe_inflight.get(cache_key) == job_id:
+                transcribe_inflight.pop(cache_key)
+        job["done"].set()
+
+
+def start_transcription(video_path: Path, payload: CaptionTranscribeRequest) -> str:
+    """Return a transcription job id for this request.
+
+    Cached transcripts complete immediately, and an identical request that is
+    already running is shared instead of starting a second Whisper pass.
+    """
+    cache_key = transcript_cache_key(
+        transcription_audio_key(video_path),
+        payload.model,
+        payload.language,
+        payload.target_language,
+    )
+    with transcribe_inflight_lock:
+        running = transcribe_inflight.get(cache_key)
+        if running is not None:
+            logger.info("Attaching to in-flight transcription %s", running)
+            return running
+
+        job_id = uuid4().hex
+        done = threading.Event()
+        transcribe_job_store[job_id] = {
+            "status": "queued",
+            "progress": 0,
+            "captions": None,
+            "error": None,
+            "status_code": None,
+            "done": done,
+        }
+        cached = load_transcript(cache_key)
+        if cached is not None:
+            logger.info("Transcript cache hit for %s", video_path.name)
+            transcribe_job_store[job_id].update(
+                status="completed",
+                progress=100,
+                captions=[CaptionEntry(**caption) for caption in cached],
+            )
+            done.set()
+            return job_id
+        transcribe_inflight[cache_key] = job_id
 
+    thread = threading.Thread(
+        target=transcribe_with_progress,
+        args=(
+            job_id,
+            cache_key,
+            video_path,
+            payload.model,
+            payload.language,
+            payload.target_language,
+        ),
+        daemon=True,
+    )
+    thread.start()
+    return job_id
 
-@router.post("/transcribe-async", response_model=CaptionTranscribeAsyncResponse)
-def caption_transcribe_async(payload: CaptionTranscribeRequest):
+
+@router.post("/transcribe", response_model=CaptionTranscribeResponse)
+def caption_transcribe(payload: CaptionTranscribeRequest):
     video_path = resolve_caption_video(payload.video_id)
     device = get_whisper_device()
-    target_model = payload.model
 
-    job_id = uuid4().hex
-    transcribe_job_store[job_id] = {
-        "status": "queued",
-        "progress": 0,
-        "captions": None,
-        "error": None,
-    }
+    job_id = start_transcription(video_path, payload)
+    job = transcribe_job_store[job_id]
+    job["done"].wait()
+    if job["status"] == "failed":
+        raise HTTPException(
+            status_code=int(job.get("status_code") or 500), detail=str(job.get("error"))
+        )
 
-    thread = threading.Thread(
-        target=transcribe_with_progress,
-        args=(job_id, video_path, target_model, device, payload.language, payload.target_language),
-        daemon=True,
+    return CaptionTranscribeResponse(
+        video_id=payload.video_id, captions=job["captions"], device=device
     )
-    thread.start()
+
+
+@router.post("/transcribe-async", response_model=CaptionTranscribeAsyncResponse)
+def caption_transcribe_async(payload: CaptionTranscribeRequest):
+    video_path = resolve_caption_video(payload.video_id)
+    job_id = start_transcription(video_path, payload)
 
     return CaptionTranscribeAsyncResponse(
         job_id=job_id,
-        status="queued",
+        status=str(transcribe_job_store[job_id]["status"]),
         status_url=f"/captioner/transcribe-status/{job_id}",
     )
 
@@ -714,6 +970,7 @@ def caption_transcribe_status(job_id: str):
 @router.post("/export", response_model=CaptionExportResponse)
 def caption_export(payload: CaptionExportRequest):
     resolve_caption_video(payload.video_id)
+    hold_caption_assets(payload.video_id)
 
     job_id = uuid4().hex
     caption_job_store[job_id] = {
@@ -724,10 +981,18 @@ def caption_export(payload: CaptionExportRequest):
         "error": None,
     }
 
-    output_path = CAPTION_TEMP_DIR / f"captioned_{job_id}.mp4"
+    suffix = SOFT_SUBTITLE_SUFFIXES.get(payload.mode, ".mp4")
+    output_path = CAPTION_TEMP_DIR / f"captioned_{job_id}{suffix}"
     thread = threading.Thread(
         target=render_captioned_video,
-        args=(job_id, payload.video_id, payload.captions, output_path),
+        args=(
+            job_id,
+            payload.video_id,
+            payload.captions,
+            output_path,
+            payload.engine,
+            payload.mode,
+        ),
         daemon=True,
     )
     thread.start()
@@ -739,6 +1004,16 @@ def caption_export(payload: CaptionExportRequest):
     )
 
 
+@router.get("/models", response_model=CaptionModelsResponse)
+def caption_models():
+    models = whisper_models.status()
+    return CaptionModelsResponse(
+        budget_bytes=whisper_models.budget_bytes,
+        resident_bytes=sum(model.resident_bytes for model in models),
+        models=models,
+    )
+
+
 @router.get("/status/{job_id}", response_model=CaptionJobStatusResponse)
 def caption_status(job_id: str):
     if job_id not in caption_job_store:
@@ -753,15 +1028,17 @@ def caption_status(job_id: str):
     )
 
 
-@router.get("/download/{job_id}")
-def caption_download(job_id: str):
+@router.api_route("/download/{job_id}", methods=["GET", "HEAD"])
+def caption_download(request: Request, job_id: str):
     if job_id not in caption_job_store:
         raise HTTPException(status_code=404, detail="Job not found")
     output_path = caption_job_store[job_id].get("output_path")
     if not output_path:
         raise HTTPException(status_code=404, detail="Output not ready")
     file_path = Path(str(output_path))
-    return FileResponse(path=file_path, filename=file_path.name, media_type="video/mp4")
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="File missing")
+    return serve_file(request, file_path, filename=file_path.name)
 
 
 @router.post("/srt")
@@ -7,10 +7,11 @@ from pathlib import Path
 from typing import Dict, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
+from backend.features.media_serving import serve_file
+
 try:
     from yt_dlp import YoutubeDL
 except Exception:  # pragma: no cover - optional dependency at runtime
@@ -247,8 +248,8 @@ def download_status(job_id: str):
     )
 
 
-@router.get("/download/{job_id}")
-def download_file(job_id: str):
+@router.api_route("/download/{job_id}", methods=["GET", "HEAD"])
+def download_file(request: Request, job_id: str):
     if job_id not in downloader_job_store:
         raise HTTPException(status_code=404, detail="Job not found")
     output_path = downloader_job_store[job_id].get("output_path")
@@ -257,9 +258,4 @@ def download_file(job_id: str):
     file_path = Path(str(output_path))
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File missing")
-    media_type = "video/webm" if file_path.suffix.lower() == ".webm" else "video/mp4"
-    return FileResponse(
-        path=file_path,
-        filename=file_path.name,
-        media_type=media_type,
-    )
+    return serve_file(request, file_path, filename=file_path.name)
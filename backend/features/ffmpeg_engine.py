@@ -0,0 +1,639 @@
+from __future__ import annotations
+
+import logging
+import re
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from backend.features.render_plan import (
+    COPY_AUDIO_CODECS,
+    FRAME_STAGES,
+    MediaInfo,
+    RenderPlan,
+    compile_render_plan,
+)
+from backend.features.render_settings import (
+    AspectRatio,
+    LogoPosition,
+    RenderSettings,
+)
+
+logger = logging.getLogger("movie-recap")
+
+OUTPUT_VIDEO_ARGS = [
+    "-c:v",
+    "libx264",
+    "-pix_fmt",
+    "yuv420p",
+    "-profile:v",
+    "baseline",
+    "-level",
+    "3.1",
+]
+OUTPUT_AUDIO_ARGS = ["-c:a", "aac", "-ac", "2", "-ar", "44100"]
+HLS_SEGMENT_SECONDS = 4
+HLS_PLAYLIST_NAME = "index.m3u8"
+
+
+class FFmpegRenderError(RuntimeError):
+    pass
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+ProgressCallback = Callable[[float], None]
+
+VIDEO_STREAM_PATTERN = re.compile(r"Stream #\d+:\d+.*?: Video: (\w+)[^,]*, (\w+)")
+AUDIO_STREAM_PATTERN = re.compile(r"Stream #\d+:\d+.*?: Audio: (\w+)")
+KEYFRAME_PATTERN = re.compile(r"pts_time:\s*([0-9.]+)")
+
+
+def get_ffmpeg_binary() -> str:
+    # Reuse the binary MoviePy resolved (FFMPEG_BINARY env or imageio-ffmpeg).
+    return str(get_setting("FFMPEG_BINARY"))
+
+
+def probe_media(path: Path) -> MediaInfo:
+    infos = ffmpeg_parse_infos(str(path))
+    if not infos.get("video_found", True) or "video_size" not in infos:
+        raise FFmpegRenderError(f"No video stream found in {path.name}")
+    width, height = infos["video_size"]
+    video_codec, pix_fmt, audio_codec = probe_codecs(path)
+    return MediaInfo(
+        width=int(width),
+        height=int(height),
+        fps=float(infos.get("video_fps") or 30),
+        duration=float(infos.get("duration") or 0),
+        has_audio=bool(infos.get("audio_found")),
+        video_codec=video_codec,
+        pix_fmt=pix_fmt,
+        audio_codec=audio_codec,
+    )
+
+
+def probe_codecs(path: Path) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    # MoviePy's parser skips codec names; read them from the same banner.
+    result = subprocess.run(
+        [get_ffmpeg_binary(), "-hide_banner", "-i", str(path)],
+        capture_output=True,
+        text=True,
+    )
+    video = VIDEO_STREAM_PATTERN.search(result.stderr)
+    audio = AUDIO_STREAM_PATTERN.search(result.stderr)
+    return (
+        video.group(1) if video else None,
+        video.group(2) if video else None,
+        audio.group(1) if audio else None,
+    )
+
+
+def find_keyframes(input_path: Path) -> list[float]:
+    # Decode keyframes only; showinfo logs one pts_time per frame it sees.
+    command = [
+        get_ffmpeg_binary(),
+        "-hide_banner",
+        "-skip_frame",
+        "nokey",
+        "-i",
+        str(input_path),
+        "-an",
+        "-vf",
+        "showinfo",
+        "-f",
+        "null",
+        "-",
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise FFmpegRenderError(f"Keyframe scan failed for {input_path.name}")
+    return sorted(float(match) for match in KEYFRAME_PATTERN.findall(result.stderr))
+
+
+def audio_output_args(audio_path: Path) -> list[str]:
+    # AAC tracks (uploads or staged audio) are muxed as-is instead of re-encoded.
+    _, _, audio_codec = probe_codecs(audio_path)
+    if audio_codec in COPY_AUDIO_CODECS:
+        return ["-c:a", "copy"]
+    return OUTPUT_AUDIO_ARGS
+
+
+def logo_overlay_position(position: LogoPosition, margin: int) -> tuple[str, str]:
+    x_left = str(margin)
+    x_right = f"main_w-overlay_w-{margin}"
+    y_top = str(margin)
+    y_bottom = f"main_h-overlay_h-{margin}"
+    positions = {
+        LogoPosition.top_left: (x_left, y_top),
+        LogoPosition.top_right: (x_right, y_top),
+        LogoPosition.bottom_left: (x_left, y_bottom),
+        LogoPosition.bottom_right: (x_right, y_bottom),
+    }
+    return positions[position]
+
+
+def fan_out(chain: str, labels: list[str], split_filter: str = "split") -> str:
+    # Append a split so one filter chain feeds several branches.
+    if len(labels) > 1:
+        chain = f"{chain},{split_filter}={len(labels)}"
+    return chain + "".join(f"[{label}]" for label in labels)
+
+
+def frame_filters(plan: RenderPlan, skip: tuple[str, ...] = ()) -> list[str]:
+    filters: list[str] = []
+    for stage in plan.stages:
+        if stage not in FRAME_STAGES or stage in skip:
+            continue
+        if stage == "crop" and plan.crop:
+            filters.append("crop={}:{}:{}:{}".format(*plan.crop))
+        elif stage == "speed":
+            filters.append(f"setpts=PTS/{plan.video_speed:.6f},fps={plan.fps:.6f}")
+        elif stage == "scale" and plan.scale:
+            filters.append("scale={}:{}".format(*plan.scale))
+    return filters
+
+
+def video_branch(
+    plan: RenderPlan,
+    source: str,
+    logo: Optional[str],
+    tag: str,
+    skip: tuple[str, ...] = (),
+) -> tuple[list[str], str]:
+    """Frame stages, filmstrip blur and logo overlay for one output.
+
+    ``logo`` is the unscaled logo stream label; ``skip`` names frame stages
+    already applied upstream. ``tag`` keeps labels unique when several
+    branches share one graph.
+    """
+    out = f"vout{tag}"
+    use_logo = logo is not None and plan.logo is not None
+    film_out = f"vfilm{tag}" if use_logo else out
+    frame_out = f"vframe{tag}" if plan.filmstrip or use_logo else out
+
+    filters = frame_filters(plan, skip)
+    chains = [f"[{source}]{','.join(filters) or 'null'}[{frame_out}]"]
+    current = frame_out
+
+    if plan.filmstrip:
+        top_offset, strip_height, radius = plan.filmstrip
+        chains.append(f"[{current}]split=2[vbase{tag}][vstrip{tag}]")
+        chains.append(
+            f"[vstrip{tag}]crop=iw:{strip_height}:0:{top_offset},boxblur={radius}:2[vblur{tag}]"
+        )
+        chains.append(f"[vbase{tag}][vblur{tag}]overlay=0:{top_offset}[{film_out}]")
+        current = film_out
+
+    if use_logo:
+        x_expr, y_expr = logo_overlay_position(plan.logo.position, plan.logo.margin)
+        chains.append(f"[{logo}]scale=-2:{plan.logo.height}[vlogo{tag}]")
+        chains.append(f"[{current}][vlogo{tag}]overlay={x_expr}:{y_expr}[{out}]")
+    return chains, out
+
+
+def build_filtergraph(
+    settings: RenderSettings,
+    info: MediaInfo,
+    logo_input: Optional[int],
+    audio_from_source: bool,
+    max_height: Optional[int] = None,
+    source_audio_input: int = 0,
+) -> tuple[str, Optional[str]]:
+    """Compile RenderSettings into one filter_complex string.
+
+    The graph follows the RenderPlan: crop, retime and downscale first, then
+    blur and logo on the output-sized frame. Returns the graph and the label
+    of the processed audio (if any).
+    """
+    plan = compile_render_plan(
+        settings,
+        info,
+        has_logo=logo_input is not None,
+        max_height=max_height,
+        external_audio=not audio_from_source,
+    )
+    logo_label = f"{logo_input}:v" if logo_input is not None else None
+    chains, _ = video_branch(plan, "0:v", logo_label, "")
+
+    audio_label: Optional[str] = None
+    if audio_from_source:
+        tempo = plan.audio_tempo
+        chains.append(
+            f"[{source_audio_input}:a]{','.join(tempo) if tempo else 'anull'}[aout]"
+        )
+        audio_label = "aout"
+
+    return ";".join(chains), audio_label
+
+
+def freeze_filter_chain(
+    spans: list[tuple[float, float]], fps: float, source: str, out: str
+) -> str:
+    # freezeframes replaces a frame range with one frame taken from its second input.
+    chains: list[str] = []
+    current = source
+    for index, (start, end) in enumerate(spans):
+        first = round(start * fps)
+        last = max(first, round(end * fps) - 1)
+        label = out if index == len(spans) - 1 else f"{out}{index}"
+        chains.append(f"[{current}]split=2[{out}a{index}][{out}b{index}]")
+        chains.append(
+            f"[{out}a{index}][{out}b{index}]freezeframes=first={first}:last={last}:replace={first}[{label}]"
+        )
+        current = label
+    return ";".join(chains)
+
+
+def hls_output_args(hls_dir: Path) -> list[str]:
+    # An EVENT playlist only ever grows, so players can start on the first segments.
+    hls_dir.mkdir(parents=True, exist_ok=True)
+    return [
+        "-f",
+        "hls",
+        "-hls_time",
+        str(HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type",
+        "event",
+        "-hls_segment_type",
+        "fmp4",
+        "-hls_flags",
+        "independent_segments",
+        "-hls_fmp4_init_filename",
+        "init.mp4",
+        "-hls_segment_filename",
+        str(hls_dir / "segment_%05d.m4s"),
+        str(hls_dir / HLS_PLAYLIST_NAME),
+    ]
+
+
+def keyframe_args(times: Optional[list[float]]) -> list[str]:
+    if not times:
+        return []
+    return ["-force_key_frames", ",".join(f"{time:.6f}" for time in times)]
+
+
+def run_ffmpeg(
+    args: list[str],
+    duration: float = 0.0,
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> None:
+    command = [
+        get_ffmpeg_binary(),
+        "-hide_banner",
+        "-y",
+        "-loglevel",
+        "error",
+        "-nostats",
+        "-progress",
+        "pipe:1",
+        *args,
+    ]
+    logger.info("Running ffmpeg: %s", " ".join(command))
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True,
+        )
+        try:
+            # -progress emits key=value lines roughly twice a second.
+            for line in process.stdout or []:
+                if cancel_event is not None and cancel_event.is_set():
+                    process.kill()
+                    raise RenderCancelled()
+                key, _, value = line.strip().partition("=")
+                # out_time_ms is also reported in microseconds by ffmpeg.
+                if key not in ("out_time_us", "out_time_ms"):
+                    continue
+                if duration > 0 and progress_callback:
+                    try:
+                        seconds = int(value) / 1_000_000
+                    except ValueError:
+                        continue
+                    progress_callback(min(1.0, seconds / duration))
+            returncode = process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        if cancel_event is not None and cancel_event.is_set():
+            raise RenderCancelled()
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+            tail = stderr.strip().splitlines()[-10:]
+            raise FFmpegRenderError(f"ffmpeg exited with {returncode}: {' | '.join(tail)}")
+
+
+def render_with_ffmpeg(
+    input_path: Path,
+    output_path: Path,
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    force_key_frames: Optional[list[float]] = None,
+    window: Optional[tuple[float, float]] = None,
+    max_height: Optional[int] = None,
+    hls_dir: Optional[Path] = None,
+    freeze: Optional[list[tuple[float, float]]] = None,
+) -> None:
+    """Render in one ffmpeg pass.
+
+    ``window`` is an optional (start, duration) range on the output timeline
+    and ``max_height`` an optional downscale; both are used for previews.
+    With ``hls_dir`` the encoder writes a growing HLS playlist of fMP4
+    segments that can be served while the render runs, and ``output_path``
+    is remuxed from it at the end. ``freeze`` spans are then applied in the
+    graph, since a progressive render cannot be spliced afterwards.
+    """
+    info = probe_media(input_path)
+    output_duration = info.duration / settings.video_speed
+    plan = compile_render_plan(
+        settings,
+        info,
+        has_logo=logo_path is not None,
+        max_height=max_height,
+        external_audio=audio_path is not None,
+    )
+    # Windows need frame-accurate seeks and forced keyframes need an encoder.
+    copy_video = plan.copy_video and not window and not force_key_frames and not freeze
+    copy_audio = plan.copy_audio and not window
+
+    def _seek(speed: float) -> list[str]:
+        if not window:
+            return []
+        start, length = window
+        return ["-ss", f"{start * speed:.6f}", "-t", f"{length * speed:.6f}"]
+
+    if window:
+        start, length = window
+        window = (start, max(0.0, min(length, output_duration - start)))
+        output_duration = window[1]
+
+    inputs = [*_seek(settings.video_speed), "-i", str(input_path)]
+    input_count = 1
+    logo_input: Optional[int] = None
+    audio_input: Optional[int] = None
+    source_audio_input = 0
+    if logo_path and not copy_video:
+        logo_input = input_count
+        inputs += ["-i", str(logo_path)]
+        input_count += 1
+    if audio_path:
+        audio_input = input_count
+        inputs += [*_seek(1.0), "-i", str(audio_path)]
+        input_count += 1
+    elif window and info.has_audio:
+        # Source audio runs at audio_speed, so it needs its own seek point.
+        source_audio_input = input_count
+        inputs += [*_seek(settings.audio_speed), "-i", str(input_path)]
+        input_count += 1
+
+    audio_label: Optional[str] = None
+    if copy_video:
+        logger.info("Identity render plan, remuxing %s with stream copy", input_path.name)
+        video_args = ["-map", "0:v:0", "-c:v", "copy"]
+    else:
+        graph, audio_label = build_filtergraph(
+            settings,
+            info,
+            logo_input=logo_input,
+            audio_from_source=audio_input is None and info.has_audio and not copy_audio,
+            max_height=max_height,
+            source_audio_input=source_audio_input,
+        )
+        video_label = "vout"
+        if freeze:
+            graph += ";" + freeze_filter_chain(freeze, info.fps, "vout", "vfreeze")
+            video_label = "vfreeze"
+        video_args = [
+            "-filter_complex",
+            graph,
+            "-map",
+            f"[{video_label}]",
+            *OUTPUT_VIDEO_ARGS,
+            *keyframe_args(force_key_frames),
+        ]
+        if hls_dir:
+            # Cut a keyframe at every segment boundary so each one plays alone.
+            video_args += ["-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})"]
+
+    if audio_path and audio_input is not None:
+        audio_args = ["-map", f"{audio_input}:a:0", *audio_output_args(audio_path)]
+    elif copy_audio:
+        audio_args = ["-map", "0:a:0", "-c:a", "copy"]
+    elif audio_label:
+        audio_args = ["-map", f"[{audio_label}]", *OUTPUT_AUDIO_ARGS]
+    elif info.has_audio:
+        # Stream-copied video with source audio that still needs processing.
+        tempo = ["-af", ",".join(plan.audio_tempo)] if plan.audio_tempo else []
+        audio_args = ["-map", "0:a:0", *tempo, *OUTPUT_AUDIO_ARGS]
+    else:
+        audio_args = ["-an"]
+
+    duration_args: list[str] = []
+    if output_duration > 0:
+        duration_args = ["-t", f"{output_duration:.3f}"]
+    output_args = ["-movflags", "+faststart", str(output_path)]
+    if hls_dir:
+        output_args = hls_output_args(hls_dir)
+    args = [
+        *inputs,
+        *video_args,
+        *audio_args,
+        *duration_args,
+        *output_args,
+    ]
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    run_ffmpeg(
+        args,
+        duration=output_duration,
+        progress_callback=progress_callback,
+        cancel_event=cancel_event,
+    )
+    if hls_dir:
+        run_ffmpeg(
+            [
+                "-i",
+                str(hls_dir / HLS_PLAYLIST_NAME),
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                str(output_path),
+            ],
+            cancel_event=cancel_event,
+        )
+    logger.info("FFmpeg render complete: %s", output_path.name)
+
+
+def render_preview_frames(
+    input_path: Path,
+    output_paths: list[Path],
+    times: list[float],
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    max_height: Optional[int] = None,
+) -> list[Path]:
+    """Render single still frames through the same filtergraph.
+
+    ``times`` are source-side output times (after any freeze remapping); one
+    JPEG is attempted per entry of ``output_paths``. Returns the paths that
+    were written: ffmpeg exits cleanly without output when a time is past the
+    last frame.
+    """
+    info = probe_media(input_path)
+    logo_input = 1 if logo_path else None
+    graph, _ = build_filtergraph(
+        settings,
+        info,
+        logo_input=logo_input,
+        audio_from_source=False,
+        max_height=max_height,
+    )
+    for time, output_path in zip(times, output_paths):
+        inputs = ["-ss", f"{time * settings.video_speed:.6f}", "-i", str(input_path)]
+        if logo_path:
+            inputs += ["-i", str(logo_path)]
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        run_ffmpeg(
+            [
+                *inputs,
+                "-filter_complex",
+                graph,
+                "-map",
+                "[vout]",
+                "-frames:v",
+                "1",
+                "-q:v",
+                "3",
+                str(output_path),
+            ]
+        )
+    return [path for path in output_paths if path.exists()]
+
+
+def render_multi_with_ffmpeg(
+    input_path: Path,
+    outputs: dict[AspectRatio, Path],
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    force_key_frames: Optional[list[float]] = None,
+) -> None:
+    """Render several aspect ratios from one decode in a single ffmpeg process.
+
+    Speed and audio processing run once; the frames are then split into one
+    blur/logo/crop/encode branch per requested ratio.
+    """
+    info = probe_media(input_path)
+    ratios = list(outputs)
+    tags = [str(index) for index in range(len(ratios))]
+
+    inputs = ["-i", str(input_path)]
+    logo_input: Optional[int] = None
+    audio_input: Optional[int] = None
+    if logo_path:
+        logo_input = 1
+        inputs += ["-i", str(logo_path)]
+    if audio_path:
+        audio_input = 2 if logo_path else 1
+        inputs += ["-i", str(audio_path)]
+
+    # Retiming is shared by every branch; crops and overlays are per ratio.
+    plans = [
+        compile_render_plan(
+            settings.model_copy(update={"aspect_ratio": ratio}),
+            info,
+            has_logo=logo_input is not None,
+            external_audio=audio_input is not None,
+        )
+        for ratio in ratios
+    ]
+    # Identity branches are stream-copied straight from the source.
+    copied = [plan.copy_video and not force_key_frames for plan in plans]
+    filtered = [tag for tag, copy in zip(tags, copied) if not copy]
+    chains: list[str] = []
+    if filtered:
+        shared = f"setpts=PTS/{settings.video_speed:.6f},fps={info.fps:.6f}"
+        if "speed" not in plans[0].stages:
+            shared = "null"
+        chains.append(fan_out(f"[0:v]{shared}", [f"vsrc{tag}" for tag in filtered]))
+        if logo_input is not None:
+            chains.append(
+                fan_out(f"[{logo_input}:v]null", [f"logosrc{tag}" for tag in filtered])
+            )
+    for plan, tag, copy in zip(plans, tags, copied):
+        if copy:
+            continue
+        logo_label = f"logosrc{tag}" if logo_input is not None else None
+        branch, _ = video_branch(plan, f"vsrc{tag}", logo_label, tag, skip=("speed",))
+        chains.extend(branch)
+
+    copy_audio = plans[0].copy_audio
+    audio_args: list[str] = ["-an"]
+    split_audio = False
+    if audio_path and audio_input is not None:
+        audio_args = ["-map", f"{audio_input}:a:0", *audio_output_args(audio_path)]
+    elif copy_audio:
+        audio_args = ["-map", "0:a:0", "-c:a", "copy"]
+    elif info.has_audio:
+        split_audio = True
+        tempo = plans[0].audio_tempo
+        chains.append(
+            fan_out(
+                f"[0:a]{','.join(tempo) if tempo else 'anull'}",
+                [f"a{tag}" for tag in tags],
+                "asplit",
+            )
+        )
+
+    output_duration = info.duration / settings.video_speed
+    duration_args = ["-t", f"{output_duration:.3f}"] if output_duration > 0 else []
+    output_args: list[str] = []
+    for ratio, tag, copy in zip(ratios, tags, copied):
+        output_path = outputs[ratio]
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if copy:
+            output_args += ["-map", "0:v:0", "-c:v", "copy"]
+        else:
+            output_args += [
+                "-map",
+                f"[vout{tag}]",
+                *OUTPUT_VIDEO_ARGS,
+                *keyframe_args(force_key_frames),
+            ]
+        if split_audio:
+            output_args += ["-map", f"[a{tag}]", *OUTPUT_AUDIO_ARGS]
+        else:
+            output_args += audio_args
+        output_args += [
+            "-movflags",
+            "+faststart",
+            *duration_args,
+            str(output_path),
+        ]
+
+    graph_args = ["-filter_complex", ";".join(chains)] if chains else []
+    run_ffmpeg(
+        [*inputs, *graph_args, *output_args],
+        duration=output_duration,
+        progress_callback=progress_callback,
+        cancel_event=cancel_event,
+    )
+    logger.info("FFmpeg multi-output render complete: %s", ", ".join(r.value for r in ratios))
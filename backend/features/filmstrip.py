@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+BOX_BLUR_PASSES = 3
+
+
+def box_radius_for_sigma(sigma: float, passes: int = BOX_BLUR_PASSES) -> int:
+    # Repeated box blurs converge to a Gaussian; pick the box width whose
+    # variance after ``passes`` iterations matches sigma^2.
+    if sigma <= 0:
+        return 0
+    width = math.sqrt(12.0 * sigma * sigma / passes + 1.0)
+    return max(1, int(round((width - 1.0) / 2.0)))
+
+
+def box_blur_axis(data: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """Box blur along one axis with a running sum (O(1) per pixel per radius)."""
+    if radius <= 0:
+        return data
+    moved = np.moveaxis(data, axis, 0)
+    length = moved.shape[0]
+    padded = np.pad(
+        moved,
+        [(radius + 1, radius)] + [(0, 0)] * (moved.ndim - 1),
+        mode="edge",
+    )
+    cumsum = np.cumsum(padded, axis=0, dtype=np.float32)
+    size = 2 * radius + 1
+    blurred = (cumsum[size : size + length] - cumsum[:length]) / size
+    return np.moveaxis(blurred, 0, axis)
+
+
+def blur_rows(
+    frame: np.ndarray, top: int, bottom: int, radius: int, passes: int = BOX_BLUR_PASSES
+) -> np.ndarray:
+    """Blur frame rows [top, bottom) and return the frame.
+
+    Only the strip plus ``passes * radius`` rows of vertical context are
+    touched, so cost is proportional to the strip area rather than the frame.
+    The frame is modified in place when its buffer is writable.
+    """
+    height = frame.shape[0]
+    top = max(0, top)
+    bottom = min(height, bottom)
+    if radius <= 0 or bottom <= top:
+        return frame
+
+    context = passes * radius
+    region_top = max(0, top - context)
+    region_bottom = min(height, bottom + context)
+    region = frame[region_top:region_bottom].astype(np.float32)
+    for _ in range(passes):
+        region = box_blur_axis(region, radius, axis=1)
+        region = box_blur_axis(region, radius, axis=0)
+
+    if not frame.flags.writeable:
+        frame = frame.copy()
+    strip = region[top - region_top : bottom - region_top]
+    frame[top:bottom] = np.clip(strip + 0.5, 0, 255).astype(frame.dtype)
+    return frame
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from backend.features.ffmpeg_engine import (
+    OUTPUT_VIDEO_ARGS,
+    FFmpegRenderError,
+    run_ffmpeg,
+)
+
+logger = logging.getLogger("movie-recap")
+
+FreezeSpan = tuple[float, float]
+
+
+def freeze_spans(
+    duration: float, interval: float, hold: float, fps: float
+) -> list[FreezeSpan]:
+    """Freeze windows on the output timeline, snapped to the frame grid.
+
+    Every ``interval`` seconds the current frame is held for ``hold`` seconds
+    (clamped so windows never overlap). Held frames replace the frames they
+    cover, so the timeline length and the audio are unchanged.
+    """
+    if duration <= 0 or fps <= 0:
+        return []
+    frame = 1.0 / fps
+    hold = min(hold, interval)
+    spans: list[FreezeSpan] = []
+    point = interval
+    while point < duration - frame:
+        start = round(point * fps) / fps
+        end = round(min(point + hold, duration) * fps) / fps
+        if end - start >= frame:
+            spans.append((start, end))
+        point += interval
+    return spans
+
+
+def freeze_keyframe_times(spans: list[FreezeSpan]) -> list[float]:
+    return [time for span in spans for time in span]
+
+
+def freeze_time_map(spans: list[FreezeSpan]) -> Callable[[float], float]:
+    """Map an output time to the source time to show (O(log N) per frame)."""
+    starts = [start for start, _ in spans]
+
+    def _map(t: float) -> float:
+        index = bisect.bisect_right(starts, t) - 1
+        if index >= 0 and t < spans[index][1]:
+            return spans[index][0]
+        return t
+
+    return _map
+
+
+def splice_freeze_frames(
+    rendered_path: Path,
+    output_path: Path,
+    spans: list[FreezeSpan],
+    duration: float,
+    fps: float,
+    cancel_event: Optional[threading.Event] = None,
+) -> None:
+    """Replace each freeze window of a rendered file with a still segment.
+
+    ``rendered_path`` must have keyframes at every span boundary (see
+    ``freeze_keyframe_times``). It is cut with stream copy, the first frame of
+    each freeze window is decoded once and encoded as a static segment, and the
+    pieces are concatenated while the original audio is muxed back untouched.
+    """
+    pieces: list[tuple[float, float, bool]] = []
+    cursor = 0.0
+    for start, end in spans:
+        if start > cursor:
+            pieces.append((cursor, start, False))
+        pieces.append((start, end, True))
+        cursor = end
+    if duration - cursor > 0.5 / fps:
+        pieces.append((cursor, duration, False))
+    boundaries = [start for start, _, _ in pieces[1:]]
+
+    work_dir = Path(tempfile.mkdtemp(prefix="freeze_", dir=output_path.parent))
+    try:
+        run_ffmpeg(
+            [
+                "-i",
+                str(rendered_path),
+                "-map",
+                "0:v:0",
+                "-c",
+                "copy",
+                "-f",
+                "segment",
+                "-segment_times",
+                ",".join(f"{time:.6f}" for time in boundaries),
+                "-reset_timestamps",
+                "1",
+                str(work_dir / "piece_%04d.mp4"),
+            ],
+            cancel_event=cancel_event,
+        )
+        piece_paths = sorted(work_dir.glob("piece_*.mp4"))
+        if len(piece_paths) != len(pieces):
+            raise FFmpegRenderError(
+                f"Expected {len(pieces)} pieces when splicing freeze frames, got {len(piece_paths)}"
+            )
+
+        concat_paths: list[Path] = []
+        for index, ((start, end, frozen), piece_path) in enumerate(zip(pieces, piece_paths)):
+            if not frozen:
+                concat_paths.append(piece_path)
+                continue
+            still_path = work_dir / f"still_{index:04d}.mp4"
+            frame_count = max(1, round((end - start) * fps))
+            run_ffmpeg(
+                [
+                    "-i",
+                    str(piece_path),
+                    "-an",
+                    "-vf",
+                    f"trim=end_frame=1,loop=loop=-1:size=1,setpts=N/({fps:.6f}*TB)",
+                    "-frames:v",
+                    str(frame_count),
+                    "-r",
+                    f"{fps:.6f}",
+                    *OUTPUT_VIDEO_ARGS,
+                    str(still_path),
+                ],
+                cancel_event=cancel_event,
+            )
+            concat_paths.append(still_path)
+
+        concat_list = work_dir / "pieces.txt"
+        concat_list.write_text(
+            "".join(f"file '{path.as_posix()}'\n" for path in concat_paths),
+            encoding="utf-8",
+        )
+        run_ffmpeg(
+            [
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(concat_list),
+                "-i",
+                str(rendered_path),
+                "-map",
+                "0:v:0",
+                "-map",
+                "1:a:0?",
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                str(output_path),
+            ],
+            cancel_event=cancel_event,
+        )
+        logger.info("Spliced %s freeze frames into %s", len(spans), output_path.name)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".m4a": "audio/mp4",
+    ".m4s": "video/iso.segment",
+    ".mkv": "video/x-matroska",
+    ".webm": "video/webm",
+    ".mp3": "audio/mpeg",
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".srt": "application/x-subrip",
+    ".ass": "text/x-ssa",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+}
+
+
+def media_type_for(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in MEDIA_TYPES:
+        return MEDIA_TYPES[suffix]
+    return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    # Outputs are written once under unique names, so mtime and size identify them.
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """Return the inclusive (start, end) of a single byte range, or None.
+
+    Multi-range and malformed headers are ignored (the full file is sent);
+    ranges that start past the end raise 416.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length <= 0:
+            raise HTTPException(
+                status_code=416, headers={"Content-Range": f"bytes */{size}"}
+            )
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+class FileRangeResponse(FileResponse):
+    """206 response for one byte range of a file, read in chunks."""
+
+    def __init__(self, path: Path, start: int, end: int, **kwargs) -> None:
+        super().__init__(path, status_code=206, **kwargs)
+        self.start = start
+        self.end = end
+        size = kwargs["stat_result"].st_size
+        self.headers["content-length"] = str(end - start + 1)
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        count = self.end - self.start + 1
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                remaining -= len(chunk)
+                more_body = remaining > 0 and bool(chunk)
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": more_body}
+                )
+                if not chunk:
+                    break
+
+
+def serve_file(
+    request: Request,
+    path: Path,
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> Response:
+    """Serve a file with ETag/If-None-Match, single byte ranges and cache headers.
+
+    Routes register both GET and HEAD; HEAD gets the same headers without a body.
+    """
+    try:
+        stat_result = path.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found.")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="File not found.")
+
+    etag = file_etag(stat_result)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = media_type or media_type_for(path)
+    byte_range: Optional[tuple[int, int]] = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, stat_result.st_size)
+
+    if byte_range is None:
+        return FileResponse(
+            path,
+            headers=headers,
+            media_type=media_type,
+            filename=filename,
+            stat_result=stat_result,
+        )
+    start, end = byte_range
+    return FileRangeResponse(
+        path,
+        start,
+        end,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+    )
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from uuid import uuid4
+
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+from backend.features.uploads import UPLOAD_MAX_BYTES, save_upload
+
+logger = logging.getLogger("movie-recap")
+
+MEDIA_STORE_DIR = Path(tempfile.gettempdir()) / "video_recap_media"
+
+
+class StoredMedia(BaseModel):
+    sha256: str
+    path: Path
+    size: int
+    filename: str
+
+
+class MediaStore:
+    """Content-addressed upload store shared by every router.
+
+    Files are kept once per SHA-256 under ``root`` and reference counted: each
+    ingest takes a reference, each release drops one, and the bytes are
+    deleted when the last reference goes away.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.staging_dir = root / "incoming"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._paths: Dict[str, Path] = {}
+        self._refs: Dict[str, int] = {}
+
+    def _existing_path(self, digest: str) -> Optional[Path]:
+        path = self._paths.get(digest)
+        if path and path.exists():
+            return path
+        # Files left behind by a previous process are still valid content.
+        for candidate in self.root.glob(f"{digest}*"):
+            if candidate.is_file():
+                return candidate
+        return None
+
+    async def ingest(
+        self, upload: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES
+    ) -> StoredMedia:
+        filename = Path(upload.filename or "upload").name
+        suffix = Path(filename).suffix.lower()
+        staging_path = self.staging_dir / f"{uuid4().hex}{suffix}"
+        result = await save_upload(upload, staging_path, max_bytes=max_bytes)
+
+        with self._lock:
+            path = self._existing_path(result.sha256)
+            if path is not None:
+                staging_path.unlink(missing_ok=True)
+                logger.info("Reusing stored media %s for %s", path.name, filename)
+            else:
+                path = self.root / f"{result.sha256}{suffix}"
+                staging_path.replace(path)
+            self._paths[result.sha256] = path
+            self._refs[result.sha256] = self._refs.get(result.sha256, 0) + 1
+
+        return StoredMedia(
+            sha256=result.sha256,
+            path=path,
+            size=result.size,
+            filename=filename,
+        )
+
+    def digest_for(self, path: Path) -> Optional[str]:
+        # Stored files are named by their SHA-256, so the name is the identity.
+        if path.parent != self.root or len(path.stem) != 64:
+            return None
+        try:
+            int(path.stem, 16)
+        except ValueError:
+            return None
+        return path.stem
+
+    def acquire(self, digest: str) -> Path:
+        with self._lock:
+            path = self._existing_path(digest)
+            if path is None:
+                raise FileNotFoundError(f"Media {digest} is not in the store")
+            self._paths[digest] = path
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+            return path
+
+    def release(self, digest: str) -> None:
+        with self._lock:
+            remaining = self._refs.get(digest, 0) - 1
+            if remaining > 0:
+                self._refs[digest] = remaining
+                return
+            self._refs.pop(digest, None)
+            path = self._paths.pop(digest, None)
+            # Unlink under the lock so a concurrent ingest cannot adopt the file.
+            if path is not None:
+                try:
+                    path.unlink(missing_ok=True)
+                except Exception:
+                    logger.warning("Failed to delete stored media: %s", path)
+
+
+media_store = MediaStore(MEDIA_STORE_DIR)
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from backend.features.ffmpeg_engine import (
+    OUTPUT_AUDIO_ARGS,
+    OUTPUT_VIDEO_ARGS,
+    ProgressCallback,
+    RenderCancelled,
+    audio_output_args,
+    build_filtergraph,
+    find_keyframes,
+    keyframe_args,
+    probe_media,
+    render_with_ffmpeg,
+    run_ffmpeg,
+)
+from backend.features.render_plan import MediaInfo, atempo_chain, compile_render_plan
+from backend.features.render_settings import RenderSettings
+
+logger = logging.getLogger("movie-recap")
+
+MIN_SEGMENT_SECONDS = 2.0
+
+
+def plan_segments(
+    keyframes: list[float], duration: float, count: int
+) -> list[tuple[float, float]]:
+    """Split [0, duration) into up to ``count`` spans that start on keyframes."""
+    if duration <= 0 or count <= 1 or not keyframes:
+        return [(0.0, duration)]
+
+    cuts = [0.0]
+    for index in range(1, count):
+        target = duration * index / count
+        nearest = min(keyframes, key=lambda time: abs(time - target))
+        if (
+            nearest - cuts[-1] >= MIN_SEGMENT_SECONDS
+            and duration - nearest >= MIN_SEGMENT_SECONDS
+        ):
+            cuts.append(nearest)
+    bounds = cuts + [duration]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def segment_video_args(
+    input_path: Path,
+    segment_path: Path,
+    start: float,
+    end: float,
+    settings: RenderSettings,
+    info: MediaInfo,
+    logo_path: Optional[Path],
+    threads: int,
+    force_key_frames: Optional[list[float]] = None,
+) -> list[str]:
+    inputs = ["-ss", f"{start:.6f}", "-t", f"{end - start:.6f}", "-i", str(input_path)]
+    logo_input: Optional[int] = None
+    if logo_path:
+        logo_input = 1
+        inputs += ["-i", str(logo_path)]
+    graph, _ = build_filtergraph(
+        settings, info, logo_input=logo_input, audio_from_source=False
+    )
+    # Keyframe times are on the output timeline; shift them into this segment.
+    offset = start / settings.video_speed
+    length = (end - start) / settings.video_speed
+    local_key_frames = [
+        time - offset for time in force_key_frames or [] if offset < time < offset + length
+    ]
+    return [
+        *inputs,
+        "-filter_complex",
+        graph,
+        "-map",
+        "[vout]",
+        "-an",
+        *OUTPUT_VIDEO_ARGS,
+        *keyframe_args(local_key_frames),
+        "-threads",
+        str(threads),
+        str(segment_path),
+    ]
+
+
+def audio_track_args(
+    input_path: Path,
+    audio_output: Path,
+    settings: RenderSettings,
+    audio_path: Optional[Path],
+    copy_audio: bool = False,
+) -> list[str]:
+    if audio_path:
+        return ["-i", str(audio_path), "-vn", *audio_output_args(audio_path), str(audio_output)]
+    if copy_audio:
+        return ["-i", str(input_path), "-vn", "-c:a", "copy", str(audio_output)]
+    tempo = atempo_chain(settings.audio_speed)
+    filter_args = ["-af", ",".join(tempo)] if tempo else []
+    return [
+        "-i",
+        str(input_path),
+        "-vn",
+        *filter_args,
+        *OUTPUT_AUDIO_ARGS,
+        str(audio_output),
+    ]
+
+
+def render_parallel(
+    input_path: Path,
+    output_path: Path,
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    force_key_frames: Optional[list[float]] = None,
+) -> None:
+    """Render GOP-aligned segments concurrently and concat them losslessly.
+
+    The source is split at keyframes into ``settings.parallel_segments`` spans.
+    Each span runs the same filtergraph in its own ffmpeg process, the audio
+    track is processed once in a separate process, and the pieces are joined
+    with the concat demuxer using stream copy. Identity plans skip the split
+    and are remuxed in one pass.
+    """
+    info = probe_media(input_path)
+    plan = compile_render_plan(
+        settings,
+        info,
+        has_logo=logo_path is not None,
+        external_audio=audio_path is not None,
+    )
+    segments = [(0.0, info.duration)]
+    if not plan.copy_video or force_key_frames:
+        segments = plan_segments(
+            find_keyframes(input_path), info.duration, settings.parallel_segments
+        )
+    if len(segments) < 2:
+        logger.info("Rendering %s in one pass", input_path.name)
+        render_with_ffmpeg(
+            input_path,
+            output_path,
+            settings,
+            logo_path,
+            audio_path,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+            force_key_frames=force_key_frames,
+        )
+        return
+
+    logger.info("Rendering %s in %s parallel segments", input_path.name, len(segments))
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix="segments_", dir=output_path.parent))
+    threads = max(1, (os.cpu_count() or 1) // len(segments))
+    abort_event = threading.Event()
+    fractions = [0.0] * (len(segments) + 1)
+    lock = threading.Lock()
+
+    def _tracker(index: int, weight: float) -> ProgressCallback:
+        def _update(fraction: float) -> None:
+            if cancel_event is not None and cancel_event.is_set():
+                abort_event.set()
+            with lock:
+                fractions[index] = fraction * weight
+                total = sum(fractions)
+            if progress_callback:
+                progress_callback(min(1.0, total))
+
+        return _update
+
+    total_seconds = max(info.duration, 1e-6)
+    jobs: list[tuple[list[str], float, ProgressCallback]] = []
+    segment_paths: list[Path] = []
+    for index, (start, end) in enumerate(segments):
+        segment_path = work_dir / f"segment_{index:03d}.mp4"
+        segment_paths.append(segment_path)
+        # Video segments carry 95% of the progress bar, weighted by length.
+        weight = 0.95 * (end - start) / total_seconds
+        args = segment_video_args(
+            input_path,
+            segment_path,
+            start,
+            end,
+            settings,
+            info,
+            logo_path,
+            threads,
+            force_key_frames=force_key_frames,
+        )
+        jobs.append((args, (end - start) / settings.video_speed, _tracker(index, weight)))
+
+    audio_output: Optional[Path] = None
+    if audio_path or info.has_audio:
+        audio_output = work_dir / "audio.m4a"
+        args = audio_track_args(
+            input_path, audio_output, settings, audio_path, copy_audio=plan.copy_audio
+        )
+        jobs.append((args, info.duration / settings.audio_speed, _tracker(len(segments), 0.05)))
+
+    def _run(job: tuple[list[str], float, ProgressCallback]) -> None:
+        args, duration, tracker = job
+        try:
+            run_ffmpeg(
+                args,
+                duration=duration,
+                progress_callback=tracker,
+                cancel_event=abort_event,
+            )
+        except RenderCancelled:
+            raise
+        except Exception:
+            abort_event.set()
+            raise
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="segment") as pool:
+            futures = [pool.submit(_run, job) for job in jobs]
+            errors = [future.exception() for future in futures]
+        if cancel_event is not None and cancel_event.is_set():
+            raise RenderCancelled()
+        failures = [error for error in errors if error and not isinstance(error, RenderCancelled)]
+        if failures:
+            raise failures[0]
+
+        concat_list = work_dir / "segments.txt"
+        concat_list.write_text(
+            "".join(f"file '{path.as_posix()}'\n" for path in segment_paths),
+            encoding="utf-8",
+        )
+        args = ["-f", "concat", "-safe", "0", "-i", str(concat_list)]
+        maps = ["-map", "0:v:0"]
+        if audio_output is not None:
+            args += ["-i", str(audio_output)]
+            maps += ["-map", "1:a:0"]
+        args += [
+            *maps,
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            "-t",
+            f"{info.duration / settings.video_speed:.3f}",
+            str(output_path),
+        ]
+        run_ffmpeg(args, cancel_event=cancel_event)
+        logger.info("Parallel render complete: %s", output_path.name)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
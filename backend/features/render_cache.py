@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from backend.features.render_settings import RenderSettings
+
+logger = logging.getLogger("movie-recap")
+
+RENDER_CACHE_DIR = Path(tempfile.gettempdir()) / "video_recap_render_cache"
+RENDER_CACHE_MAX_BYTES = int(
+    os.getenv("RENDER_CACHE_MAX_BYTES", str(20 * 1024 * 1024 * 1024))
+)
+# Bump when a pipeline change alters the rendered pixels for the same settings.
+RENDER_PIPELINE_VERSION = 2
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    # Hard links make cache hits free; fall back to a copy across filesystems.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def render_cache_key(
+    source_sha256: str,
+    settings: RenderSettings,
+    logo_sha256: Optional[str] = None,
+    audio_sha256: Optional[str] = None,
+) -> str:
+    payload = {
+        "pipeline": RENDER_PIPELINE_VERSION,
+        "source": source_sha256,
+        # Progressive delivery does not change the rendered file.
+        "settings": settings.model_dump(mode="json", exclude={"progressive"}),
+        "logo": logo_sha256,
+        "audio": audio_sha256,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """On-disk render output cache with size-bounded LRU eviction.
+
+    Entries are ``<key>.mp4`` files; a hit refreshes the file's mtime so the
+    least recently used entries are evicted first once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str, suffix: str = ".mp4") -> Path:
+        return self.root / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = ".mp4") -> Optional[Path]:
+        path = self._path(key, suffix)
+        with self._lock:
+            if not path.exists():
+                return None
+            os.utime(path)
+        logger.info("Render cache hit: %s", key)
+        return path
+
+    def link_entry(self, key: str, target: Path, suffix: str = ".mp4") -> bool:
+        """Link a cached entry to ``target``; False on a miss.
+
+        Linking under the lock means a concurrent eviction cannot delete the
+        entry between the lookup and the link.
+        """
+        path = self._path(key, suffix)
+        with self._lock:
+            try:
+                os.utime(path)
+                link_or_copy(path, target)
+            except FileNotFoundError:
+                return False
+        logger.info("Render cache hit: %s", key)
+        return True
+
+    def put(self, key: str, output_path: Path) -> Path:
+        path = self._path(key, output_path.suffix)
+        with self._lock:
+            link_or_copy(output_path, path)
+            self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        for entry in self.root.iterdir():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.is_file():
+                entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            try:
+                entry.unlink(missing_ok=True)
+            except OSError:
+                # Still open elsewhere (e.g. memory-mapped on Windows); retry later.
+                continue
+            total -= size
+            logger.info("Render cache evicted: %s", entry.name)
+
+
+render_cache = RenderCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+from backend.features.render_settings import (
+    LogoPosition,
+    RenderSettings,
+    aspect_ratio_value,
+)
+
+# Stages that change the frame geometry or rate, applied before any compositing.
+FRAME_STAGES = ("crop", "speed", "scale")
+# Streams in these formats can be copied into the MP4 output without re-encoding.
+COPY_VIDEO_CODECS = {"h264"}
+COPY_PIX_FMTS = {"yuv420p", "yuvj420p"}
+COPY_AUDIO_CODECS = {"aac"}
+
+
+class MediaInfo(BaseModel):
+    width: int
+    height: int
+    fps: float
+    duration: float
+    has_audio: bool
+    video_codec: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    audio_codec: Optional[str] = None
+
+
+class LogoPlacement(BaseModel):
+    position: LogoPosition
+    height: int
+    margin: int
+
+
+class RenderPlan(BaseModel):
+    """What a render will actually do, in execution order.
+
+    Only stages that change the output are present in ``stages``. Cropping
+    and downscaling run before the filmstrip blur and logo overlay, so every
+    composited pixel ends up in the output frame. ``copy_video`` and
+    ``copy_audio`` mark streams that can be remuxed without re-encoding.
+    """
+
+    source_width: int
+    source_height: int
+    fps: float
+    video_speed: float
+    stages: list[str]
+    crop: Optional[tuple[int, int, int, int]] = None
+    scale: Optional[tuple[int, int]] = None
+    width: int
+    height: int
+    filmstrip: Optional[tuple[int, int, int]] = None
+    logo: Optional[LogoPlacement] = None
+    external_audio: bool = False
+    has_audio: bool = False
+    audio_tempo: list[str] = []
+    copy_video: bool = False
+    copy_audio: bool = False
+
+    def describe(self) -> list[str]:
+        lines = [f"source {self.source_width}x{self.source_height} @ {self.fps:.3f} fps"]
+        for stage in self.stages:
+            if stage == "crop" and self.crop:
+                crop_w, crop_h, crop_x, crop_y = self.crop
+                lines.append(f"crop {crop_w}x{crop_h} at {crop_x},{crop_y}")
+            elif stage == "speed":
+                lines.append(f"retime video x{self.video_speed:g}")
+            elif stage == "scale" and self.scale:
+                lines.append(f"scale to {self.scale[0]}x{self.scale[1]}")
+            elif stage == "filmstrip" and self.filmstrip:
+                top, strip_height, radius = self.filmstrip
+                lines.append(
+                    f"filmstrip blur rows {top}-{top + strip_height} radius {radius}"
+                )
+            elif stage == "logo" and self.logo:
+                lines.append(
+                    f"logo {self.logo.position.value} {self.logo.height}px high, margin {self.logo.margin}px"
+                )
+        if self.copy_video:
+            lines.append("video: stream copy")
+        if self.external_audio:
+            lines.append("audio: uploaded track")
+        elif not self.has_audio:
+            lines.append("audio: none")
+        elif self.audio_tempo:
+            lines.append(f"audio: {','.join(self.audio_tempo)}")
+        elif self.copy_audio:
+            lines.append("audio: stream copy")
+        else:
+            lines.append("audio: re-encode")
+        lines.append(f"output {self.width}x{self.height}")
+        return lines
+
+
+def even(value: float) -> int:
+    return max(2, int(value) // 2 * 2)
+
+
+def atempo_chain(speed: float) -> list[str]:
+    # A single atempo instance only accepts 0.5-2.0, so chain them for 0.25-5.0.
+    filters: list[str] = []
+    remaining = speed
+    while remaining > 2.0:
+        filters.append("atempo=2.0")
+        remaining /= 2.0
+    while remaining < 0.5:
+        filters.append("atempo=0.5")
+        remaining /= 0.5
+    if abs(remaining - 1.0) > 1e-6:
+        filters.append(f"atempo={remaining:.6f}")
+    return filters
+
+
+def crop_box(width: int, height: int, target_ratio: float) -> tuple[int, int, int, int]:
+    current_ratio = width / height
+    if abs(current_ratio - target_ratio) < 0.001:
+        return even(width), even(height), 0, 0
+    if current_ratio > target_ratio:
+        new_width = even(height * target_ratio)
+        return new_width, even(height), (width - new_width) // 2, 0
+    new_height = even(width / target_ratio)
+    return even(width), new_height, 0, (height - new_height) // 2
+
+
+def filmstrip_strip(
+    settings: RenderSettings, height: int, blur_scale: float = 1.0
+) -> Optional[tuple[int, int, int]]:
+    if not settings.filmstrip_enabled or aspect_ratio_value(settings.aspect_ratio) >= 1:
+        return None
+    top_offset = int(height * settings.filmstrip_position_pct / 100)
+    strip_height = min(
+        max(1, int(height * settings.filmstrip_thickness_pct / 100)),
+        height - top_offset,
+    )
+    # The radius is in full-resolution pixels; ``blur_scale`` shrinks it with a
+    # downscaled preview so the blur looks the same as in the final render.
+    radius = int(round(settings.filmstrip_intensity_pct / 10))
+    if radius > 0:
+        radius = max(1, int(round(radius * blur_scale)))
+    # boxblur radius is bounded by the (subsampled) chroma plane of the strip.
+    radius = min(radius, strip_height // 4)
+    if strip_height <= 0 or radius <= 0:
+        return None
+    return top_offset, strip_height, radius
+
+
+def compile_render_plan(
+    settings: RenderSettings,
+    info: MediaInfo,
+    has_logo: bool,
+    max_height: Optional[int] = None,
+    external_audio: bool = False,
+) -> RenderPlan:
+    """Compile RenderSettings for one source into an ordered RenderPlan.
+
+    The aspect crop comes first and ``max_height`` downscales the cropped
+    frame. Speeding up retimes before the downscale so dropped frames are
+    never scaled; slowing down retimes after it so duplicated frames are
+    already small. Blur and logo geometry is relative to the output frame.
+    A plan with no stages over an H.264 source is an identity render and the
+    video stream can be copied; source AAC audio at unit speed is copied too.
+    """
+    crop_w, crop_h, crop_x, crop_y = crop_box(
+        info.width, info.height, aspect_ratio_value(settings.aspect_ratio)
+    )
+    crop: Optional[tuple[int, int, int, int]] = None
+    if (crop_w, crop_h) != (info.width, info.height):
+        crop = (crop_w, crop_h, crop_x, crop_y)
+    width, height = crop_w, crop_h
+
+    scale: Optional[tuple[int, int]] = None
+    if max_height and height > max_height:
+        scale = (even(width * max_height / height), even(max_height))
+        width, height = scale
+
+    retime = abs(settings.video_speed - 1.0) > 1e-6
+    stages: list[str] = []
+    if crop:
+        stages.append("crop")
+    if retime and settings.video_speed > 1:
+        stages.append("speed")
+    if scale:
+        stages.append("scale")
+    if retime and settings.video_speed < 1:
+        stages.append("speed")
+
+    strip = filmstrip_strip(settings, height, blur_scale=height / crop_h)
+    if strip:
+        stages.append("filmstrip")
+
+    logo: Optional[LogoPlacement] = None
+    if has_logo:
+        logo = LogoPlacement(
+            position=settings.logo_position,
+            height=max(2, int(height * 0.12)),
+            margin=int(height * 0.03),
+        )
+        stages.append("logo")
+
+    audio_tempo = [] if external_audio else atempo_chain(settings.audio_speed)
+    return RenderPlan(
+        source_width=info.width,
+        source_height=info.height,
+        fps=info.fps,
+        video_speed=settings.video_speed,
+        stages=stages,
+        crop=crop,
+        scale=scale,
+        width=width,
+        height=height,
+        filmstrip=strip,
+        logo=logo,
+        external_audio=external_audio,
+        has_audio=external_audio or info.has_audio,
+        audio_tempo=audio_tempo,
+        copy_video=not stages
+        and info.video_codec in COPY_VIDEO_CODECS
+        and info.pix_fmt in COPY_PIX_FMTS,
+        copy_audio=not external_audio
+        and info.has_audio
+        and not audio_tempo
+        and info.audio_codec in COPY_AUDIO_CODECS,
+    )
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class AspectRatio(str, Enum):
+    tiktok = "tiktok"
+    youtube = "youtube"
+    shorts = "shorts"
+    classic = "classic"
+    square = "square"
+
+
+class LogoPosition(str, Enum):
+    top_left = "Top Left"
+    top_right = "Top Right"
+    bottom_left = "Bottom Left"
+    bottom_right = "Bottom Right"
+
+
+class RenderEngine(str, Enum):
+    ffmpeg = "ffmpeg"
+    moviepy = "moviepy"
+
+
+class RenderSettings(BaseModel):
+    video_speed: float = Field(1.0, ge=0.25, le=5.0)
+    audio_speed: float = Field(1.0, ge=0.25, le=5.0)
+    filmstrip_enabled: bool = True
+    filmstrip_position_pct: float = Field(80, ge=0, le=100)
+    filmstrip_thickness_pct: float = Field(15, ge=0, le=100)
+    filmstrip_intensity_pct: float = Field(25, ge=0, le=100)
+    freeze_frame_enabled: bool = True
+    freeze_frame_interval: float = Field(8, ge=1, le=120)
+    freeze_frame_duration: float = Field(3, ge=0.1, le=10)
+    logo_position: LogoPosition = LogoPosition.bottom_right
+    aspect_ratio: AspectRatio = AspectRatio.tiktok
+    engine: RenderEngine = Field(
+        RenderEngine.ffmpeg,
+        description="Render backend. 'ffmpeg' runs a single native filtergraph; 'moviepy' is the fallback.",
+    )
+    parallel_segments: int = Field(
+        1,
+        ge=1,
+        le=32,
+        description="ffmpeg engine only: split the source at keyframes and render this many segments concurrently.",
+    )
+    progressive: bool = Field(
+        False,
+        description="ffmpeg engine only: also publish the render as a growing HLS playlist of fMP4 segments while it encodes.",
+    )
+
+
+ASPECT_RATIO_MAP = {
+    AspectRatio.tiktok: (9, 16),
+    AspectRatio.youtube: (16, 9),
+    AspectRatio.shorts: (3, 4),
+    AspectRatio.classic: (4, 3),
+    AspectRatio.square: (1, 1),
+}
+
+
+def aspect_ratio_value(ratio: AspectRatio) -> float:
+    width, height = ASPECT_RATIO_MAP[ratio]
+    return float(width) / float(height)
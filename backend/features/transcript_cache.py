@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+from backend.features.render_cache import RenderCache
+
+logger = logging.getLogger("movie-recap")
+
+TRANSCRIPT_CACHE_DIR = Path(tempfile.gettempdir()) / "video_recap_transcript_cache"
+TRANSCRIPT_CACHE_MAX_BYTES = int(
+    os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+# Bump when decoding parameters or caption post-processing change the output.
+TRANSCRIPT_PIPELINE_VERSION = 1
+
+transcript_cache = RenderCache(TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_BYTES)
+
+
+def transcript_cache_key(
+    audio_key: str,
+    model: str,
+    language: Optional[str],
+    target_language: Optional[str],
+) -> str:
+    payload = {
+        "pipeline": TRANSCRIPT_PIPELINE_VERSION,
+        "audio": audio_key,
+        "model": model,
+        "language": language or "auto",
+        "target_language": target_language or "auto",
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_transcript(key: str) -> Optional[list[dict]]:
+    path = transcript_cache.get(key, suffix=".json")
+    if path is None:
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logger.warning("Unreadable transcript in cache: %s", path.name)
+        return None
+
+
+def save_transcript(key: str, captions: list[dict]) -> None:
+    work_path = Path(tempfile.gettempdir()) / f"transcript_{uuid4().hex}.json"
+    try:
+        work_path.write_text(json.dumps(captions, ensure_ascii=False), encoding="utf-8")
+        transcript_cache.put(key, work_path)
+    except OSError:
+        logger.warning("Failed to persist transcript %s", key)
+    finally:
+        work_path.unlink(missing_ok=True)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+
+from backend.features.ffmpeg_engine import run_ffmpeg
+from backend.features.media_store import media_store
+from backend.features.render_cache import RenderCache
+
+logger = logging.getLogger("movie-recap")
+
+# Whisper's feature extractor expects 16 kHz mono float32 samples.
+WHISPER_SAMPLE_RATE = 16000
+TRANSCRIBE_AUDIO_DIR = Path(tempfile.gettempdir()) / "video_recap_transcribe_audio"
+TRANSCRIBE_AUDIO_MAX_BYTES = int(
+    os.getenv("TRANSCRIBE_AUDIO_MAX_BYTES", str(2 * 1024 * 1024 * 1024))
+)
+
+# Decodes of the same source are serialized; a fixed pool of lock stripes keeps
+# memory flat however many distinct files are transcribed.
+DECODE_LOCK_STRIPES = 64
+
+pcm_cache = RenderCache(TRANSCRIBE_AUDIO_DIR, TRANSCRIBE_AUDIO_MAX_BYTES)
+_decode_locks = [threading.Lock() for _ in range(DECODE_LOCK_STRIPES)]
+
+
+def transcription_audio_key(video_path: Path) -> str:
+    source = media_store.digest_for(video_path)
+    if source is None:
+        stat = video_path.stat()
+        source = f"{video_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    payload = f"{source}|pcm_f32le|{WHISPER_SAMPLE_RATE}|mono"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_transcription_audio(video_path: Path) -> np.ndarray:
+    """Return the video's audio as 16 kHz mono float32, decoding it only once.
+
+    The samples are cached as raw PCM per source content and memory-mapped
+    copy-on-write, so the first Whisper pass, the empty-result retry and later
+    re-transcriptions of the same media share one decode.
+    """
+    key = transcription_audio_key(video_path)
+    with _decode_locks[int(key[:8], 16) % DECODE_LOCK_STRIPES]:
+        cached_path = pcm_cache.get(key, suffix=".f32")
+        if cached_path is None:
+            work_path = Path(tempfile.gettempdir()) / f"transcribe_audio_{uuid4().hex}.f32"
+            try:
+                logger.info("Decoding %s to 16 kHz PCM for transcription", video_path.name)
+                run_ffmpeg(
+                    [
+                        "-i",
+                        str(video_path),
+                        "-vn",
+                        "-ac",
+                        "1",
+                        "-ar",
+                        str(WHISPER_SAMPLE_RATE),
+                        "-f",
+                        "f32le",
+                        str(work_path),
+                    ]
+                )
+                cached_path = pcm_cache.put(key, work_path)
+            finally:
+                work_path.unlink(missing_ok=True)
+        if cached_path.stat().st_size == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.memmap(cached_path, dtype=np.float32, mode="c")
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("movie-recap")
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(4 * 1024 * 1024 * 1024)))
+
+
+class UploadResult(BaseModel):
+    path: Path
+    size: int
+    sha256: str
+
+
+def _write_chunk(buffer: BinaryIO, digest: "hashlib._Hash", chunk: bytes) -> None:
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+async def save_upload(
+    upload: UploadFile,
+    target_path: Path,
+    max_bytes: int = UPLOAD_MAX_BYTES,
+) -> UploadResult:
+    """Stream an upload to disk in fixed-size chunks.
+
+    Memory stays at one chunk regardless of file size. The SHA-256 is computed
+    while streaming and the file only appears at target_path once complete.
+    """
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = target_path.with_name(f"{target_path.name}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with partial_path.open("wb") as buffer:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit.",
+                    )
+                await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+        partial_path.replace(target_path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    finally:
+        await upload.close()
+
+    logger.info("Upload saved: %s (%s bytes)", target_path.name, size)
+    return UploadResult(path=target_path, size=size, sha256=digest.hexdigest())
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from backend.features.transcription_audio import WHISPER_SAMPLE_RATE
+from backend.features.whisper_models import (
+    WHISPER_BATCH_SIZE,
+    WhisperModelManager,
+    whisper_models,
+)
+
+try:
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+except Exception:
+    VadOptions = None
+    get_speech_timestamps = None
+
+logger = logging.getLogger("movie-recap")
+
+# Whisper decodes 30 s of audio at a time; longer windows are truncated.
+WHISPER_WINDOW_SECONDS = 30
+WHISPER_BATCH_WAIT_MS = int(os.getenv("WHISPER_BATCH_WAIT_MS", "50"))
+
+
+class TranscribeOptions(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    language: Optional[str] = None
+    task: str = "transcribe"
+    initial_prompt: Optional[str] = None
+    beam_size: int = 5
+    best_of: int = 5
+    patience: float = 1.0
+    word_timestamps: bool = False
+    min_silence_duration_ms: int = 2000
+    speech_pad_ms: int = 400
+
+
+class TranscribedSegment(BaseModel):
+    start: float
+    end: float
+    text: str
+
+
+def speech_windows(audio: np.ndarray, options: TranscribeOptions) -> list[tuple[int, int]]:
+    """Split audio into speech windows of at most 30 s, as sample ranges.
+
+    Speech is found with faster-whisper's Silero VAD and neighbouring speech
+    chunks are merged while they fit one Whisper window. Without the VAD the
+    audio is cut into fixed 30 s windows.
+    """
+    window = WHISPER_WINDOW_SECONDS * WHISPER_SAMPLE_RATE
+    if get_speech_timestamps is None:
+        return [(start, min(start + window, len(audio))) for start in range(0, len(audio), window)]
+
+    chunks = get_speech_timestamps(
+        audio,
+        VadOptions(
+            max_speech_duration_s=WHISPER_WINDOW_SECONDS,
+            min_silence_duration_ms=options.min_silence_duration_ms,
+            speech_pad_ms=options.speech_pad_ms,
+        ),
+    )
+    windows: list[tuple[int, int]] = []
+    for chunk in chunks:
+        start, end = int(chunk["start"]), int(chunk["end"])
+        if windows and end - windows[-1][0] <= window:
+            windows[-1] = (windows[-1][0], end)
+            continue
+        while end - start > window:
+            windows.append((start, start + window))
+            start += window
+        windows.append((start, end))
+    return windows
+
+
+class BatchJob:
+    def __init__(
+        self,
+        model_name: str,
+        model: object,
+        audio: np.ndarray,
+        windows: list[tuple[int, int]],
+        options: TranscribeOptions,
+        progress_callback: Optional[Callable[[float], None]],
+    ) -> None:
+        self.model_name = model_name
+        self.model = model
+        self.audio = audio
+        self.pending = list(enumerate(windows))
+        self.options = options
+        self.progress_callback = progress_callback
+        self.total = len(windows)
+        self.finished = 0
+        self.in_flight = 0
+        self.results: dict[int, list[TranscribedSegment]] = {}
+        self.detected_language: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+
+    def ready(self) -> bool:
+        # Without a language hint the first window detects the language for the rest.
+        if self.options.language is None and self.in_flight:
+            return False
+        return bool(self.pending) and self.error is None
+
+
+class WhisperBatchScheduler:
+    """Runs speech windows from every active transcription through shared models.
+
+    Each job's audio is cut into VAD speech windows and queued. A job holds
+    one reference on its model from submission until its last window, so the
+    model manager never evicts it mid-transcription. A dispatcher thread takes
+    up to ``batch_size`` windows at a time that share a model and decoding
+    options, round-robin across the jobs on the model of the previous batch,
+    and moves to another model only when those jobs have nothing ready.
+    Windows are decoded in parallel on the model's workers, shifted back onto
+    each job's timeline, and progress is reported per finished window.
+    """
+
+    def __init__(self, models: WhisperModelManager, batch_size: int, batch_wait: float) -> None:
+        self.models = models
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._cond = threading.Condition()
+        self._jobs: list[BatchJob] = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=batch_size, thread_name_prefix="whisper-window"
+        )
+        self._dispatcher: Optional[threading.Thread] = None
+        self._current_model: Optional[str] = None
+
+    def transcribe(
+        self,
+        model_name: str,
+        audio: np.ndarray,
+        options: TranscribeOptions,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ) -> tuple[list[TranscribedSegment], Optional[str]]:
+        """Transcribe audio and return its segments and the detected language."""
+        windows = speech_windows(audio, options)
+        if not windows:
+            return [], options.language
+        with self.models.acquire(model_name) as model:
+            job = BatchJob(model_name, model, audio, windows, options, progress_callback)
+            with self._cond:
+                self._jobs.append(job)
+                if self._dispatcher is None:
+                    self._dispatcher = threading.Thread(
+                        target=self._dispatch, name="whisper-batch", daemon=True
+                    )
+                    self._dispatcher.start()
+                self._cond.notify_all()
+            job.done.wait()
+        if job.error is not None:
+            raise job.error
+        segments = [segment for index in sorted(job.results) for segment in job.results[index]]
+        return segments, job.detected_language
+
+    def _next_batch(self) -> list[tuple[BatchJob, int, tuple[int, int]]]:
+        ready = [job for job in self._jobs if job.ready()]
+        if not ready:
+            return []
+        # Stay on the previous batch's model while its jobs have work, rather
+        # than alternating between models on every batch.
+        head = next(
+            (job for job in ready if job.model_name == self._current_model), ready[0]
+        )
+        self._current_model = head.model_name
+        group = [
+            job
+            for job in ready
+            if job.model_name == head.model_name and job.options == head.options
+        ]
+        batch: list[tuple[BatchJob, int, tuple[int, int]]] = []
+        while len(batch) < self.batch_size and group:
+            for job in list(group):
+                index, window = job.pending.pop(0)
+                job.in_flight += 1
+                batch.append((job, index, window))
+                if not job.ready() or len(batch) == self.batch_size:
+                    group.remove(job)
+                if len(batch) == self.batch_size:
+                    break
+        # Rotate so the next batch starts with a different job.
+        self._jobs.remove(head)
+        self._jobs.append(head)
+        return batch
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cond:
+                while not any(job.ready() for job in self._jobs):
+                    self._cond.wait()
+                ready_windows = sum(len(job.pending) for job in self._jobs if job.ready())
+                if ready_windows < self.batch_size and self.batch_wait > 0:
+                    # Give jobs starting at the same time a chance to share the batch.
+                    self._cond.wait(self.batch_wait)
+                batch = self._next_batch()
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch: list[tuple[BatchJob, int, tuple[int, int]]]) -> None:
+        started = time.perf_counter()
+        futures = [
+            self._executor.submit(self._decode_window, job.model, job, window)
+            for job, _, window in batch
+        ]
+        outcomes: list[tuple[Optional[tuple], Optional[Exception]]] = []
+        for future in futures:
+            try:
+                outcomes.append((future.result(), None))
+            except Exception as exc:
+                outcomes.append((None, exc))
+        logger.info(
+            "Whisper batch of %s window(s) from %s job(s) in %.1fs",
+            len(batch),
+            len({id(job) for job, _, _ in batch}),
+            time.perf_counter() - started,
+        )
+
+        with self._cond:
+            for (job, index, _), (outcome, error) in zip(batch, outcomes):
+                job.in_flight -= 1
+                if error is not None:
+                    job.error = job.error or error
+                else:
+                    segments, language = outcome
+                    job.results[index] = segments
+                    if language and job.detected_language is None:
+                        job.detected_language = language
+                        if job.options.language is None:
+                            job.options = job.options.model_copy(update={"language": language})
+                    job.finished += 1
+                    if job.progress_callback:
+                        job.progress_callback(job.finished / job.total)
+                if job.in_flight == 0 and (job.error is not None or not job.pending):
+                    self._jobs.remove(job)
+                    job.done.set()
+            self._cond.notify_all()
+
+    @staticmethod
+    def _decode_window(
+        model: object, job: BatchJob, window: tuple[int, int]
+    ) -> tuple[list[TranscribedSegment], Optional[str]]:
+        start, end = window
+        offset = start / WHISPER_SAMPLE_RATE
+        options = job.options
+        segments_iter, info = model.transcribe(
+            job.audio[start:end],
+            language=options.language,
+            task=options.task,
+            initial_prompt=options.initial_prompt,
+            beam_size=options.beam_size,
+            best_of=options.best_of,
+            patience=options.patience,
+            word_timestamps=options.word_timestamps,
+            # Windows are already speech-only.
+            vad_filter=False,
+        )
+        segments = [
+            TranscribedSegment(
+                start=offset + float(segment.start),
+                end=offset + float(segment.end),
+                text=str(segment.text),
+            )
+            for segment in segments_iter
+        ]
+        return segments, getattr(info, "language", None)
+
+
+whisper_scheduler = WhisperBatchScheduler(
+    whisper_models, WHISPER_BATCH_SIZE, WHISPER_BATCH_WAIT_MS / 1000
+)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+try:
+    from faster_whisper import WhisperModel
+except Exception:
+    WhisperModel = None
+
+try:
+    import torch
+except Exception:
+    torch = None
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+logger = logging.getLogger("movie-recap")
+
+WHISPER_MODEL_BUDGET_BYTES = int(
+    os.getenv("WHISPER_MODEL_BUDGET_BYTES", str(8 * 1024 * 1024 * 1024))
+)
+# Windows decoded in parallel per batch; each is a CTranslate2 worker on one model.
+WHISPER_BATCH_SIZE = max(1, int(os.getenv("WHISPER_BATCH_SIZE", "4")))
+WHISPER_PRELOAD_MODELS = [
+    name.strip() for name in os.getenv("WHISPER_PRELOAD_MODELS", "").split(",") if name.strip()
+]
+# Parameter counts, used to budget a model before it is loaded.
+WHISPER_MODEL_PARAMS = {
+    "small": 244_000_000,
+    "medium": 769_000_000,
+    "large-v2": 1_550_000_000,
+    "large-v3": 1_550_000_000,
+}
+COMPUTE_TYPE_BYTES = {"float32": 4, "float16": 2, "int8": 1}
+
+
+class WhisperModelStatus(BaseModel):
+    model: str
+    device: str
+    compute_type: str
+    in_use: int
+    resident_bytes: int
+    resident_measured: bool
+    load_seconds: float
+    last_used: float
+
+
+def get_whisper_device() -> str:
+    if torch and torch.cuda.is_available():
+        return "cuda"
+    return "cpu"
+
+
+def get_compute_type(device: str) -> str:
+    # CPU int8 can degrade transcription quality for Burmese; prefer float32.
+    return "float16" if device == "cuda" else "float32"
+
+
+def estimate_model_bytes(model_size: str, compute_type: str) -> int:
+    params = WHISPER_MODEL_PARAMS.get(model_size, WHISPER_MODEL_PARAMS["large-v3"])
+    return params * COMPUTE_TYPE_BYTES.get(compute_type, 4)
+
+
+def process_rss() -> Optional[int]:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class WhisperModelManager:
+    """Loads faster-whisper models within a memory budget.
+
+    Models are reference counted while a transcription uses them. When a load
+    would exceed ``budget_bytes``, idle models are evicted least recently used
+    first; models in use are never evicted, so the budget may be exceeded
+    temporarily rather than failing a request. Loads are serialized so the
+    resident-size measurement (RSS delta) is not skewed by a concurrent load.
+    """
+
+    def __init__(self, budget_bytes: int) -> None:
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._entries: OrderedDict[str, Dict[str, object]] = OrderedDict()
+
+    def _resident_bytes(self) -> int:
+        return sum(int(entry["resident_bytes"]) for entry in self._entries.values())
+
+    def _evict_for(self, incoming_bytes: int) -> None:
+        for key in list(self._entries):
+            if self._resident_bytes() + incoming_bytes <= self.budget_bytes:
+                return
+            entry = self._entries[key]
+            if int(entry["in_use"]) > 0:
+                continue
+            del self._entries[key]
+            logger.info(
+                "Evicted Whisper model %s (%.0f MB)",
+                key,
+                int(entry["resident_bytes"]) / 1e6,
+            )
+
+    def _load(self, model_size: str, device: str, compute_type: str) -> Dict[str, object]:
+        if WhisperModel is None:
+            raise HTTPException(
+                status_code=500,
+                detail="faster-whisper is not installed. Please install it.",
+            )
+        key = f"{model_size}:{device}:{compute_type}"
+        estimate = estimate_model_bytes(model_size, compute_type)
+        with self._lock:
+            self._evict_for(estimate)
+        logger.info("Loading faster-whisper model %s on %s (%s)", model_size, device, compute_type)
+        rss_before = process_rss()
+        started = time.perf_counter()
+        model = WhisperModel(
+            model_size,
+            device=device,
+            compute_type=compute_type,
+            # Split the cores between workers instead of oversubscribing them.
+            cpu_threads=max(1, (os.cpu_count() or 1) // WHISPER_BATCH_SIZE),
+            num_workers=WHISPER_BATCH_SIZE,
+        )
+        load_seconds = time.perf_counter() - started
+        rss_after = process_rss()
+        measured = (
+            device == "cpu"
+            and rss_before is not None
+            and rss_after is not None
+            and rss_after > rss_before
+        )
+        resident = rss_after - rss_before if measured else estimate
+        logger.info(
+            "Loaded Whisper model %s in %.1fs (%.0f MB resident%s)",
+            key,
+            load_seconds,
+            resident / 1e6,
+            "" if measured else ", estimated",
+        )
+        return {
+            "model": model,
+            "model_size": model_size,
+            "device": device,
+            "compute_type": compute_type,
+            "in_use": 0,
+            "resident_bytes": resident,
+            "resident_measured": measured,
+            "load_seconds": load_seconds,
+            "last_used": time.time(),
+        }
+
+    def _checkout(self, model_size: str) -> str:
+        device = get_whisper_device()
+        compute_type = get_compute_type(device)
+        key = f"{model_size}:{device}:{compute_type}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["in_use"] = int(entry["in_use"]) + 1
+                self._entries.move_to_end(key)
+                return key
+        with self._load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["in_use"] = int(entry["in_use"]) + 1
+                    self._entries.move_to_end(key)
+                    return key
+            entry = self._load(model_size, device, compute_type)
+            with self._lock:
+                entry["in_use"] = 1
+                self._entries[key] = entry
+                self._evict_for(0)
+        return key
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry["in_use"] = max(0, int(entry["in_use"]) - 1)
+            entry["last_used"] = time.time()
+            self._evict_for(0)
+
+    @contextmanager
+    def acquire(self, model_size: str) -> Iterator["WhisperModel"]:
+        """Hold a model; callers keep it for a whole transcription, not per call."""
+        key = self._checkout(model_size)
+        try:
+            with self._lock:
+                model = self._entries[key]["model"]
+            yield model
+        finally:
+            self._release(key)
+
+    def preload(self, model_sizes: list[str]) -> None:
+        for model_size in model_sizes:
+            if model_size not in WHISPER_MODEL_PARAMS:
+                logger.warning("Skipping unknown Whisper model in preload: %s", model_size)
+                continue
+            try:
+                self._release(self._checkout(model_size))
+            except Exception:
+                logger.exception("Failed to preload Whisper model %s", model_size)
+
+    def status(self) -> list[WhisperModelStatus]:
+        with self._lock:
+            return [
+                WhisperModelStatus(
+                    model=str(entry["model_size"]),
+                    device=str(entry["device"]),
+                    compute_type=str(entry["compute_type"]),
+                    in_use=int(entry["in_use"]),
+                    resident_bytes=int(entry["resident_bytes"]),
+                    resident_measured=bool(entry["resident_measured"]),
+                    load_seconds=round(float(entry["load_seconds"]), 3),
+                    last_used=float(entry["last_used"]),
+                )
+                for entry in self._entries.values()
+            ]
+
+
+whisper_models = WhisperModelManager(WHISPER_MODEL_BUDGET_BYTES)
+
+
+def preload_whisper_models() -> None:
+    # Warm models in the background so startup is not blocked by downloads.
+    if not WHISPER_PRELOAD_MODELS:
+        return
+    threading.Thread(
+        target=whisper_models.preload,
+        args=(WHISPER_PRELOAD_MODELS,),
+        name="whisper-preload",
+        daemon=True,
+    ).start()
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-from enum import Enum
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional
 from uuid import uuid4
 import logging
+import os
+import shutil
 import tempfile
+import threading
 
-from fastapi import FastAPI, File, Form, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
 from moviepy.editor import (
     AudioFileClip,
     CompositeVideoClip,
@@ -17,12 +21,45 @@ from moviepy.editor import (
     VideoFileClip,
     vfx,
 )
-from pydantic import BaseModel, Field
+from proglog import ProgressBarLogger
+from pydantic import BaseModel, TypeAdapter
 from PIL import Image
+from starlette.concurrency import run_in_threadpool
 
+from backend.features.audio_stage import staged_audio_track
 from backend.features.captioner import router as captioner_router
 from backend.features.downloader import router as downloader_router
+from backend.features.ffmpeg_engine import (
+    HLS_PLAYLIST_NAME,
+    FFmpegRenderError,
+    ProgressCallback,
+    RenderCancelled,
+    probe_media,
+    render_multi_with_ffmpeg,
+    render_preview_frames,
+    render_with_ffmpeg,
+)
+from backend.features.filmstrip import blur_rows, box_radius_for_sigma
+from backend.features.freeze_frames import (
+    FreezeSpan,
+    freeze_keyframe_times,
+    freeze_spans,
+    freeze_time_map,
+    splice_freeze_frames,
+)
+from backend.features.media_serving import DEFAULT_CACHE_CONTROL, serve_file
+from backend.features.media_store import StoredMedia, media_store
+from backend.features.parallel_render import render_parallel
+from backend.features.render_cache import render_cache, render_cache_key
+from backend.features.render_plan import LogoPlacement, MediaInfo, compile_render_plan
+from backend.features.render_settings import (
+    AspectRatio,
+    LogoPosition,
+    RenderEngine,
+    RenderSettings,
+)
 from backend.features.srt_finder import router as srt_finder_router
+from backend.features.whisper_models import preload_whisper_models
 
 LOG_DIR = Path(__file__).resolve().parent / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -42,7 +79,14 @@ logger = logging.getLogger("movie-recap")
 if not hasattr(Image, "ANTIALIAS"):
     Image.ANTIALIAS = Image.LANCZOS  # type: ignore[attr-defined]
 
-app = FastAPI(title="Movie Recap Backend", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    preload_whisper_models()
+    yield
+
+
+app = FastAPI(title="Movie Recap Backend", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -57,113 +101,93 @@ app.include_router(downloader_router)
 app.include_router(srt_finder_router)
 
 
-class AspectRatio(str, Enum):
-    tiktok = "tiktok"
-    youtube = "youtube"
-    shorts = "shorts"
-    classic = "classic"
-    square = "square"
-
-
-class LogoPosition(str, Enum):
-    top_left = "Top Left"
-    top_right = "Top Right"
-    bottom_left = "Bottom Left"
-    bottom_right = "Bottom Right"
+PREVIEW_MAX_HEIGHT = 360
+PREVIEW_CLEANUP_DELAY = 900
+# Lets players finish the tail of a progressive stream before it is deleted.
+STREAM_CLEANUP_DELAY = 120
+RENDER_MAX_WORKERS = max(1, int(os.getenv("RENDER_MAX_WORKERS", "2")))
+render_executor = ThreadPoolExecutor(
+    max_workers=RENDER_MAX_WORKERS, thread_name_prefix="render"
+)
+render_job_store: Dict[str, Dict[str, object]] = {}
+render_job_futures: Dict[str, Future] = {}
+render_cancel_events: Dict[str, threading.Event] = {}
 
 
-class RenderSettings(BaseModel):
-    video_speed: float = Field(1.0, ge=0.25, le=5.0)
-    audio_speed: float = Field(1.0, ge=0.25, le=5.0)
-    filmstrip_enabled: bool = True
-    filmstrip_position_pct: float = Field(80, ge=0, le=100)
-    filmstrip_thickness_pct: float = Field(15, ge=0, le=100)
-    filmstrip_intensity_pct: float = Field(25, ge=0, le=100)
-    freeze_frame_enabled: bool = True
-    freeze_frame_interval: float = Field(8, ge=1, le=120)
-    freeze_frame_duration: float = Field(3, ge=0.1, le=10)
-    logo_position: LogoPosition = LogoPosition.bottom_right
-    aspect_ratio: AspectRatio = AspectRatio.tiktok
+class RenderJobResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
 
 
-class RenderResponse(BaseModel):
-    output_path: str
-    output_url: str
+class RenderJobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    progress: int
     aspect_ratio: AspectRatio
+    output_url: Optional[str] = None
+    outputs: Optional[dict[str, str]] = None
+    stream_url: Optional[str] = None
+    plan: Optional[dict[str, list[str]]] = None
+    error: Optional[str] = None
 
 
-ASPECT_RATIO_MAP = {
-    AspectRatio.tiktok: (9, 16),
-    AspectRatio.youtube: (16, 9),
-    AspectRatio.shorts: (3, 4),
-    AspectRatio.classic: (4, 3),
-    AspectRatio.square: (1, 1),
-}
-
-
-def aspect_ratio_value(ratio: AspectRatio) -> float:
-    width, height = ASPECT_RATIO_MAP[ratio]
-    return float(width) / float(height)
-
+class RenderPreviewResponse(BaseModel):
+    output_url: Optional[str] = None
+    frame_urls: list[str] = []
+    aspect_ratio: AspectRatio
+    video_sha256: Optional[str] = None
+    logo_sha256: Optional[str] = None
+    audio_sha256: Optional[str] = None
 
-def resize_to_aspect(clip: VideoFileClip, ratio: AspectRatio) -> VideoFileClip:
-    target_ratio = aspect_ratio_value(ratio)
-    width, height = clip.size
-    current_ratio = width / height
 
-    if abs(current_ratio - target_ratio) < 0.001:
-        return clip
+class RenderProgressLogger(ProgressBarLogger):
+    """Forward MoviePy frame progress to a job and abort on cancellation."""
 
-    if current_ratio > target_ratio:
-        new_width = int(height * target_ratio)
-        x_center = width / 2
-        return clip.crop(
-            x_center=x_center,
-            width=new_width,
-        )
+    def __init__(
+        self,
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> None:
+        super().__init__()
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
 
-    new_height = int(width / target_ratio)
-    y_center = height / 2
-    return clip.crop(
-        y_center=y_center,
-        height=new_height,
-    )
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise RenderCancelled()
+        if bar != "t" or attr != "index" or not self.progress_callback:
+            return
+        total = self.bars[bar].get("total")
+        if total:
+            self.progress_callback(min(1.0, value / total))
 
 
 def apply_filmstrip_blur(
     clip: VideoFileClip,
-    enabled: bool,
-    position_pct: float,
-    thickness_pct: float,
+    strip: tuple[int, int, int],
     intensity_pct: float,
-    aspect_ratio: AspectRatio,
 ) -> VideoFileClip:
-    if not enabled or aspect_ratio_value(aspect_ratio) >= 1:
+    top_offset, blur_height, _ = strip
+    radius = box_radius_for_sigma(max(0.0, intensity_pct / 10))
+    if radius <= 0:
         return clip
 
-    width, height = clip.size
-    blur_height = max(1, int(height * thickness_pct / 100))
-    top_offset = int(height * position_pct / 100)
-
-    blur_radius = max(0.0, intensity_pct / 10)
-    blurred = clip.fx(vfx.blur, blur_radius)
-    blurred_strip = blurred.crop(y1=top_offset, y2=top_offset + blur_height)
-    base = CompositeVideoClip([clip, blurred_strip.set_position((0, top_offset))])
-    return base.set_duration(clip.duration)
+    # Blur only the strip rows of each frame instead of the full frame.
+    return clip.fl_image(
+        lambda frame: blur_rows(frame, top_offset, top_offset + blur_height, radius)
+    )
 
 
 def overlay_logo(
     clip: VideoFileClip,
-    logo_path: Optional[Path],
-    position: LogoPosition,
+    logo_path: Path,
+    placement: LogoPlacement,
 ) -> VideoFileClip:
-    if not logo_path:
-        return clip
-
     logo = ImageClip(str(logo_path)).set_duration(clip.duration)
-    logo = logo.resize(height=int(clip.h * 0.12))
+    logo = logo.resize(height=placement.height)
 
-    margin = int(clip.h * 0.03)
+    margin = placement.margin
     x_left = margin
     x_right = clip.w - logo.w - margin
     y_top = margin
@@ -177,7 +201,7 @@ def overlay_logo(
     }
 
     return CompositeVideoClip(
-        [clip, logo.set_position(positions[position])]
+        [clip, logo.set_position(positions[placement.position])]
     ).set_duration(clip.duration)
 
 
@@ -187,10 +211,14 @@ def process_video(
     settings: RenderSettings,
     logo_path: Optional[Path],
     audio_path: Optional[Path],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    hls_dir: Optional[Path] = None,
+    stream_dropped: Optional[Callable[[], None]] = None,
 ) -> None:
     logger.info("Starting render for %s", input_path.name)
     logger.info(
-        "Settings | sync: v=%sx a=%sx | filmstrip: %s pos=%s%% thick=%s%% intensity=%s%% | freeze: %s interval=%ss duration=%ss | logo: %s | ratio: %s",
+        "Settings | sync: v=%sx a=%sx | filmstrip: %s pos=%s%% thick=%s%% intensity=%s%% | freeze: %s interval=%ss duration=%ss | logo: %s | ratio: %s | engine: %s",
         settings.video_speed,
         settings.audio_speed,
         settings.filmstrip_enabled,
@@ -202,28 +230,360 @@ def process_video(
         settings.freeze_frame_duration,
         settings.logo_position,
         settings.aspect_ratio,
+        settings.engine,
     )
+
+    with staged_audio_track(
+        input_path, output_path, settings, audio_path, cancel_event
+    ) as audio_track:
+        if settings.engine == RenderEngine.ffmpeg:
+            try:
+                render_ffmpeg_pipeline(
+                    input_path,
+                    output_path,
+                    settings,
+                    logo_path,
+                    audio_track,
+                    progress_callback=progress_callback,
+                    cancel_event=cancel_event,
+                    hls_dir=hls_dir,
+                )
+                return
+            except FFmpegRenderError:
+                logger.exception(
+                    "FFmpeg engine failed for %s, falling back to MoviePy", input_path.name
+                )
+                if hls_dir:
+                    # MoviePy cannot continue the stream; drop the partial playlist.
+                    shutil.rmtree(hls_dir, ignore_errors=True)
+                    if stream_dropped:
+                        stream_dropped()
+
+        process_video_moviepy(
+            input_path,
+            output_path,
+            settings,
+            logo_path,
+            audio_track,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+
+
+def process_video_multi(
+    input_path: Path,
+    outputs: dict[AspectRatio, Path],
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    hls_dir: Optional[Path] = None,
+    stream_dropped: Optional[Callable[[], None]] = None,
+) -> None:
+    """Render one output per aspect ratio, sharing the decode where possible.
+
+    ``hls_dir`` (progressive streaming) only applies to single-ratio renders.
+    """
+    if len(outputs) == 1:
+        ratio, output_path = next(iter(outputs.items()))
+        process_video(
+            input_path,
+            output_path,
+            settings.model_copy(update={"aspect_ratio": ratio}),
+            logo_path,
+            audio_path,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+            hls_dir=hls_dir,
+            stream_dropped=stream_dropped,
+        )
+        return
+
+    logger.info(
+        "Starting multi-ratio render for %s: %s",
+        input_path.name,
+        ", ".join(ratio.value for ratio in outputs),
+    )
+    first_output = next(iter(outputs.values()))
+    with staged_audio_track(
+        input_path, first_output, settings, audio_path, cancel_event
+    ) as audio_track:
+        if settings.engine == RenderEngine.ffmpeg:
+            try:
+                render_multi_pipeline(
+                    input_path,
+                    outputs,
+                    settings,
+                    logo_path,
+                    audio_track,
+                    progress_callback=progress_callback,
+                    cancel_event=cancel_event,
+                )
+                return
+            except FFmpegRenderError:
+                logger.exception(
+                    "FFmpeg engine failed for %s, falling back to MoviePy", input_path.name
+                )
+
+        for index, (ratio, output_path) in enumerate(outputs.items()):
+
+            def _progress(fraction: float, index: int = index) -> None:
+                if progress_callback:
+                    progress_callback((index + fraction) / len(outputs))
+
+            process_video_moviepy(
+                input_path,
+                output_path,
+                settings.model_copy(update={"aspect_ratio": ratio}),
+                logo_path,
+                audio_track,
+                progress_callback=_progress,
+                cancel_event=cancel_event,
+            )
+
+
+def output_freeze_spans(info: MediaInfo, settings: RenderSettings) -> list[FreezeSpan]:
+    if not settings.freeze_frame_enabled:
+        return []
+    return freeze_spans(
+        info.duration / settings.video_speed,
+        settings.freeze_frame_interval,
+        settings.freeze_frame_duration,
+        info.fps,
+    )
+
+
+def render_plan_report(
+    input_path: Path,
+    settings: RenderSettings,
+    ratios: list[AspectRatio],
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+) -> dict[str, list[str]]:
+    info = probe_media(input_path)
+    report: dict[str, list[str]] = {}
+    for ratio in ratios:
+        ratio_settings = settings.model_copy(update={"aspect_ratio": ratio})
+        lines = compile_render_plan(
+            ratio_settings,
+            info,
+            has_logo=logo_path is not None,
+            external_audio=audio_path is not None,
+        ).describe()
+        spans = output_freeze_spans(info, ratio_settings)
+        if spans:
+            lines.insert(-1, f"freeze {len(spans)} holds of {settings.freeze_frame_duration:g}s")
+        report[ratio.value] = lines
+    return report
+
+
+def render_ffmpeg_pipeline(
+    input_path: Path,
+    output_path: Path,
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    window: Optional[tuple[float, float]] = None,
+    max_height: Optional[int] = None,
+    hls_dir: Optional[Path] = None,
+) -> None:
+    info = probe_media(input_path)
+    duration = info.duration / settings.video_speed
+    spans = output_freeze_spans(info, settings)
+    if hls_dir:
+        # Segments are published as they encode, so freeze frames go in the graph.
+        render_with_ffmpeg(
+            input_path,
+            output_path,
+            settings,
+            logo_path,
+            audio_path,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+            hls_dir=hls_dir,
+            freeze=spans,
+        )
+        return
+    if window:
+        # Keep the freeze windows that start inside the preview, shifted to it.
+        start, length = window
+        start = round(start * info.fps) / info.fps
+        for span_start, span_end in spans:
+            if span_start < start < span_end:
+                # Opening inside a hold: start at the hold so its still is the held frame.
+                length += start - span_start
+                start = span_start
+                break
+        window = (start, length)
+        duration = max(0.0, min(length, duration - start))
+        spans = [
+            (span_start - start, min(span_end - start, duration))
+            for span_start, span_end in spans
+            if start <= span_start < start + duration
+        ]
+
+    if window or max_height:
+        renderer = partial(render_with_ffmpeg, window=window, max_height=max_height)
+    elif settings.parallel_segments > 1:
+        renderer = render_parallel
+    else:
+        renderer = render_with_ffmpeg
+
+    if not spans:
+        renderer(
+            input_path,
+            output_path,
+            settings,
+            logo_path,
+            audio_path,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+        return
+
+    def _render_progress(fraction: float) -> None:
+        if progress_callback:
+            progress_callback(fraction * 0.9)
+
+    # Render with keyframes at every freeze boundary, then splice stills in.
+    intermediate_path = output_path.with_name(f"{output_path.stem}.prefreeze.mp4")
+    try:
+        renderer(
+            input_path,
+            intermediate_path,
+            settings,
+            logo_path,
+            audio_path,
+            progress_callback=_render_progress,
+            cancel_event=cancel_event,
+            force_key_frames=freeze_keyframe_times(spans),
+        )
+        splice_freeze_frames(
+            intermediate_path,
+            output_path,
+            spans,
+            duration=duration,
+            fps=info.fps,
+            cancel_event=cancel_event,
+        )
+    finally:
+        intermediate_path.unlink(missing_ok=True)
+
+
+def render_multi_pipeline(
+    input_path: Path,
+    outputs: dict[AspectRatio, Path],
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> None:
+    info = probe_media(input_path)
+    spans = output_freeze_spans(info, settings)
+    if not spans:
+        render_multi_with_ffmpeg(
+            input_path,
+            outputs,
+            settings,
+            logo_path,
+            audio_path,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+        return
+
+    def _render_progress(fraction: float) -> None:
+        if progress_callback:
+            progress_callback(fraction * 0.9)
+
+    intermediates = {
+        ratio: path.with_name(f"{path.stem}.prefreeze.mp4") for ratio, path in outputs.items()
+    }
+    try:
+        render_multi_with_ffmpeg(
+            input_path,
+            intermediates,
+            settings,
+            logo_path,
+            audio_path,
+            progress_callback=_render_progress,
+            cancel_event=cancel_event,
+            force_key_frames=freeze_keyframe_times(spans),
+        )
+        for ratio, output_path in outputs.items():
+            splice_freeze_frames(
+                intermediates[ratio],
+                output_path,
+                spans,
+                duration=info.duration / settings.video_speed,
+                fps=info.fps,
+                cancel_event=cancel_event,
+            )
+    finally:
+        for path in intermediates.values():
+            path.unlink(missing_ok=True)
+
+
+def process_video_moviepy(
+    input_path: Path,
+    output_path: Path,
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> None:
     clip = VideoFileClip(str(input_path))
+    info = MediaInfo(
+        width=clip.w,
+        height=clip.h,
+        fps=clip.fps or 30,
+        duration=clip.duration,
+        has_audio=clip.audio is not None,
+    )
+    plan = compile_render_plan(
+        settings,
+        info,
+        has_logo=logo_path is not None,
+        external_audio=audio_path is not None,
+    )
+    logger.info("Render plan: %s", " | ".join(plan.describe()))
 
-    clip = clip.fx(vfx.speedx, factor=settings.video_speed)
+    # Crop first so the blur and logo only ever touch output pixels.
+    source_audio = clip.audio
+    if plan.crop:
+        crop_w, crop_h, crop_x, crop_y = plan.crop
+        clip = clip.crop(x1=crop_x, y1=crop_y, width=crop_w, height=crop_h)
+    if "speed" in plan.stages:
+        clip = clip.fx(vfx.speedx, factor=settings.video_speed)
     if audio_path:
-        logger.info("Using uploaded audio: %s", audio_path.name)
+        logger.info("Using audio track: %s", audio_path.name)
         audio_clip = AudioFileClip(str(audio_path))
         clip = clip.set_audio(audio_clip)
-    elif clip.audio:
-        clip = clip.set_audio(clip.audio.fx(vfx.speedx, factor=settings.audio_speed))
-
-    clip = apply_filmstrip_blur(
-        clip,
-        enabled=settings.filmstrip_enabled,
-        position_pct=settings.filmstrip_position_pct,
-        thickness_pct=settings.filmstrip_thickness_pct,
-        intensity_pct=settings.filmstrip_intensity_pct,
-        aspect_ratio=settings.aspect_ratio,
-    )
+    elif source_audio is not None:
+        if plan.audio_tempo:
+            source_audio = source_audio.fx(vfx.speedx, factor=settings.audio_speed)
+        clip = clip.set_audio(source_audio)
 
-    clip = overlay_logo(clip, logo_path, settings.logo_position)
-    clip = resize_to_aspect(clip, settings.aspect_ratio)
+    if settings.freeze_frame_enabled:
+        spans = freeze_spans(
+            clip.duration,
+            settings.freeze_frame_interval,
+            settings.freeze_frame_duration,
+            info.fps,
+        )
+        if spans:
+            # Remap time for video frames only; the audio keeps playing through holds.
+            clip = clip.fl_time(freeze_time_map(spans), apply_to=[], keep_duration=True)
+
+    if plan.filmstrip:
+        clip = apply_filmstrip_blur(clip, plan.filmstrip, settings.filmstrip_intensity_pct)
+    if plan.logo and logo_path:
+        clip = overlay_logo(clip, logo_path, plan.logo)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
     try:
@@ -248,8 +608,12 @@ def process_video(
             audio_codec="aac",
             fps=output_fps,
             ffmpeg_params=ffmpeg_params,
+            logger=RenderProgressLogger(progress_callback, cancel_event),
         )
         logger.info("Render complete: %s", output_path.name)
+    except RenderCancelled:
+        logger.info("Render cancelled: %s", output_path.name)
+        raise
     except Exception:
         logger.exception("Render failed for %s", input_path.name)
         raise
@@ -261,7 +625,231 @@ def get_temp_dir() -> Path:
     return Path(tempfile.gettempdir())
 
 
-@app.post("/render", response_model=RenderResponse)
+def release_render_media(job_id: str) -> None:
+    job = render_job_store.get(job_id)
+    if not job:
+        return
+    for digest in job.pop("media", None) or []:
+        media_store.release(digest)
+
+
+def drop_render_stream(job: Dict[str, object], delay: float = 0) -> None:
+    """Delete a job's HLS directory and stop advertising its stream."""
+    hls_dir = job.get("hls_dir")
+    if not hls_dir:
+        return
+
+    def _cleanup() -> None:
+        job["hls_dir"] = None
+        job["stream_url"] = None
+        shutil.rmtree(hls_dir, ignore_errors=True)
+
+    if delay <= 0:
+        _cleanup()
+        return
+    timer = threading.Timer(delay, _cleanup)
+    timer.daemon = True
+    timer.start()
+
+
+def run_render_job(
+    job_id: str,
+    input_path: Path,
+    outputs: dict[AspectRatio, Path],
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+) -> None:
+    job = render_job_store[job_id]
+    cancel_event = render_cancel_events[job_id]
+    if cancel_event.is_set():
+        job["status"] = "cancelled"
+        release_render_media(job_id)
+        return
+
+    def _progress(fraction: float) -> None:
+        job["progress"] = max(1, min(99, int(fraction * 100)))
+
+    try:
+        job["status"] = "processing"
+        job["progress"] = 1
+        job["plan"] = render_plan_report(
+            input_path, settings, list(outputs), logo_path, audio_path
+        )
+        for ratio, lines in job["plan"].items():
+            logger.info("Render plan [%s]: %s", ratio, " | ".join(lines))
+        process_video_multi(
+            input_path,
+            outputs,
+            settings,
+            logo_path,
+            audio_path,
+            progress_callback=_progress,
+            cancel_event=cancel_event,
+            hls_dir=Path(job["hls_dir"]) if job.get("hls_dir") else None,
+            stream_dropped=partial(drop_render_stream, job),
+        )
+        for ratio, output_path in outputs.items():
+            try:
+                render_cache.put(job["cache_keys"][ratio], output_path)
+            except Exception:
+                logger.warning("Failed to cache render output: %s", output_path.name)
+            job["outputs"][ratio.value] = f"/download/{output_path.name}"
+        complete_render_job(job)
+    except RenderCancelled:
+        for output_path in outputs.values():
+            output_path.unlink(missing_ok=True)
+        job["status"] = "cancelled"
+        job["progress"] = 0
+    except MemoryError:
+        logger.exception("Render ran out of memory for %s", input_path.name)
+        job["status"] = "failed"
+        job["error"] = "Memory error during render."
+        job["progress"] = 0
+    except Exception as exc:
+        logger.exception("Render pipeline failed for %s", input_path.name)
+        job["status"] = "failed"
+        job["error"] = str(exc)
+        job["progress"] = 0
+    finally:
+        # The output replaces the stream once the render completes.
+        drop_render_stream(
+            job, STREAM_CLEANUP_DELAY if job["status"] == "completed" else 0
+        )
+        release_render_media(job_id)
+        render_cancel_events.pop(job_id, None)
+        render_job_futures.pop(job_id, None)
+
+
+def complete_render_job(job: Dict[str, object]) -> None:
+    output_url = job["outputs"][job["aspect_ratio"].value]
+    job["status"] = "completed"
+    job["progress"] = 100
+    job["output_path"] = str(get_temp_dir() / Path(output_url).name)
+    job["output_url"] = output_url
+
+
+async def ingest_render_media(
+    video: UploadFile,
+    logo: Optional[UploadFile],
+    audio: Optional[UploadFile],
+) -> tuple[StoredMedia, Optional[StoredMedia], Optional[StoredMedia]]:
+    stored_media: list[StoredMedia] = []
+    try:
+        source = await media_store.ingest(video)
+        stored_media.append(source)
+        logger.info("Uploaded video stored: %s", source.path)
+
+        stored_logo: Optional[StoredMedia] = None
+        if logo:
+            stored_logo = await media_store.ingest(logo)
+            stored_media.append(stored_logo)
+            logger.info("Uploaded logo stored: %s", stored_logo.path)
+
+        stored_audio: Optional[StoredMedia] = None
+        if audio:
+            stored_audio = await media_store.ingest(audio)
+            stored_media.append(stored_audio)
+            logger.info("Uploaded audio stored: %s", stored_audio.path)
+    except BaseException:
+        for media in stored_media:
+            media_store.release(media.sha256)
+        raise
+    return source, stored_logo, stored_audio
+
+
+def queue_render_job(
+    source: StoredMedia,
+    stored_logo: Optional[StoredMedia],
+    stored_audio: Optional[StoredMedia],
+    settings: RenderSettings,
+    ratios: list[AspectRatio],
+) -> RenderJobResponse:
+    """Create a render job for one or more aspect ratios.
+
+    Ratios already in the render cache are linked straight to their outputs;
+    the rest are rendered together in the worker pool.
+    """
+    job_id = uuid4().hex
+    stem = Path(source.filename).stem
+    outputs = {
+        ratio: get_temp_dir()
+        / (
+            f"rendered_{job_id}_{stem}.mp4"
+            if len(ratios) == 1
+            else f"rendered_{job_id}_{stem}_{ratio.value}.mp4"
+        )
+        for ratio in ratios
+    }
+    cache_keys = {
+        ratio: render_cache_key(
+            source.sha256,
+            settings.model_copy(update={"aspect_ratio": ratio}),
+            logo_sha256=stored_logo.sha256 if stored_logo else None,
+            audio_sha256=stored_audio.sha256 if stored_audio else None,
+        )
+        for ratio in ratios
+    }
+    job: Dict[str, object] = {
+        "status": "queued",
+        "progress": 0,
+        "aspect_ratio": ratios[0],
+        "media": [
+            media.sha256 for media in (source, stored_logo, stored_audio) if media
+        ],
+        "cache_keys": cache_keys,
+        "hls_dir": None,
+        "stream_url": None,
+        "outputs": {},
+        "output_path": None,
+        "output_url": None,
+        "error": None,
+    }
+    render_job_store[job_id] = job
+
+    pending: dict[AspectRatio, Path] = {}
+    for ratio, output_path in outputs.items():
+        if not render_cache.link_entry(cache_keys[ratio], output_path):
+            pending[ratio] = output_path
+            continue
+        job["outputs"][ratio.value] = f"/download/{output_path.name}"
+
+    if not pending:
+        release_render_media(job_id)
+        complete_render_job(job)
+        return RenderJobResponse(
+            job_id=job_id,
+            status="completed",
+            status_url=f"/render/status/{job_id}",
+        )
+
+    if (
+        settings.progressive
+        and settings.engine == RenderEngine.ffmpeg
+        and len(pending) == 1
+        and len(ratios) == 1
+    ):
+        job["hls_dir"] = str(get_temp_dir() / f"stream_{job_id}")
+        job["stream_url"] = f"/render/stream/{job_id}/{HLS_PLAYLIST_NAME}"
+
+    render_cancel_events[job_id] = threading.Event()
+    render_job_futures[job_id] = render_executor.submit(
+        run_render_job,
+        job_id,
+        source.path,
+        pending,
+        settings,
+        stored_logo.path if stored_logo else None,
+        stored_audio.path if stored_audio else None,
+    )
+    return RenderJobResponse(
+        job_id=job_id,
+        status="queued",
+        status_url=f"/render/status/{job_id}",
+    )
+
+
+@app.post("/render", response_model=RenderJobResponse)
 async def render_video(
     video: UploadFile = File(...),
     audio: UploadFile | None = File(None),
@@ -269,11 +857,14 @@ async def render_video(
     settings: str = Form(...),
 ):
     """
-    Render a recap video based on uploaded video and settings.
+    Queue a recap render based on uploaded video and settings.
 
     - video: main video file
     - logo: optional logo image
     - settings: JSON string representing RenderSettings
+
+    The render runs in a bounded worker pool (RENDER_MAX_WORKERS); poll
+    /render/status/{job_id} for progress and the output URL.
     """
     logger.info("Render request received")
     try:
@@ -283,44 +874,260 @@ async def render_video(
         raise
 
     logger.info("Render requested: %s", video.filename)
+    source, stored_logo, stored_audio = await ingest_render_media(video, logo, audio)
+    return queue_render_job(
+        source, stored_logo, stored_audio, parsed_settings, [parsed_settings.aspect_ratio]
+    )
 
-    temp_dir = get_temp_dir()
-    input_path = temp_dir / Path(video.filename).name
-    with input_path.open("wb") as buffer:
-        buffer.write(await video.read())
-    logger.info("Uploaded video saved: %s", input_path)
-
-    logo_path: Optional[Path] = None
-    if logo:
-        logo_path = temp_dir / Path(logo.filename).name
-        with logo_path.open("wb") as buffer:
-            buffer.write(await logo.read())
-        logger.info("Uploaded logo saved: %s", logo_path)
-
-    audio_path: Optional[Path] = None
-    if audio:
-        audio_path = temp_dir / Path(audio.filename).name
-        with audio_path.open("wb") as buffer:
-            buffer.write(await audio.read())
-        logger.info("Uploaded audio saved: %s", audio_path)
-
-    output_name = f"rendered_{uuid4().hex}_{Path(video.filename).stem}.mp4"
-    output_path = temp_dir / output_name
+
+@app.post("/render/multi", response_model=RenderJobResponse)
+async def render_video_multi(
+    video: UploadFile = File(...),
+    audio: UploadFile | None = File(None),
+    logo: UploadFile | None = File(None),
+    settings: str = Form(...),
+    aspect_ratios: str = Form(...),
+):
+    """
+    Queue one render that produces several aspect ratios from a single decode.
+
+    - aspect_ratios: JSON list of AspectRatio values, e.g. ["tiktok", "youtube"]
+    - settings.aspect_ratio is ignored in favour of aspect_ratios
+    """
+    logger.info("Multi-ratio render request received")
     try:
-        process_video(input_path, output_path, parsed_settings, logo_path, audio_path)
+        parsed_settings = RenderSettings.model_validate_json(settings)
+        ratios = TypeAdapter(list[AspectRatio]).validate_json(aspect_ratios)
     except Exception:
-        logger.exception("Render pipeline failed for %s", video.filename)
+        logger.exception("Invalid multi-ratio render payload")
         raise
+    ratios = list(dict.fromkeys(ratios))
+    if not ratios:
+        raise HTTPException(status_code=400, detail="At least one aspect ratio is required.")
 
-    return RenderResponse(
-        output_path=str(output_path),
-        output_url=f"/download/{output_name}",
-        aspect_ratio=parsed_settings.aspect_ratio,
+    source, stored_logo, stored_audio = await ingest_render_media(video, logo, audio)
+    return queue_render_job(source, stored_logo, stored_audio, parsed_settings, ratios)
+
+
+def render_job_status(job_id: str) -> RenderJobStatusResponse:
+    job = render_job_store[job_id]
+    return RenderJobStatusResponse(
+        job_id=job_id,
+        status=str(job.get("status")),
+        progress=int(job.get("progress", 0)),
+        aspect_ratio=job["aspect_ratio"],
+        output_url=job.get("output_url"),
+        outputs=job.get("outputs") or None,
+        stream_url=job.get("stream_url"),
+        plan=job.get("plan"),
+        error=job.get("error"),
     )
 
 
-@app.get("/download/{file_name}")
-def download_render(file_name: str):
+@app.get("/render/status/{job_id}", response_model=RenderJobStatusResponse)
+def render_status(job_id: str):
+    if job_id not in render_job_store:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return render_job_status(job_id)
+
+
+@app.post("/render/cancel/{job_id}", response_model=RenderJobStatusResponse)
+def render_cancel(job_id: str):
+    if job_id not in render_job_store:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = render_job_store[job_id]
+    if job.get("status") in ("completed", "failed", "cancelled"):
+        return render_job_status(job_id)
+
+    cancel_event = render_cancel_events.get(job_id)
+    if cancel_event is not None:
+        cancel_event.set()
+    future = render_job_futures.get(job_id)
+    if future is not None and future.cancel():
+        # Never started: the worker will not run, so finish the bookkeeping here.
+        render_job_futures.pop(job_id, None)
+        render_cancel_events.pop(job_id, None)
+        release_render_media(job_id)
+        job["status"] = "cancelled"
+    else:
+        job["status"] = "cancelling"
+    logger.info("Render cancel requested: %s", job_id)
+    return render_job_status(job_id)
+
+
+def schedule_preview_cleanup(paths: list[Path], delay: int = PREVIEW_CLEANUP_DELAY) -> None:
+    def _cleanup() -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    timer = threading.Timer(delay, _cleanup)
+    timer.daemon = True
+    timer.start()
+
+
+def schedule_preview_release(digests: list[str], delay: int = PREVIEW_CLEANUP_DELAY) -> None:
+    # Keep preview sources stored for a while so the next preview can pass their digests.
+    def _release() -> None:
+        for digest in digests:
+            media_store.release(digest)
+
+    timer = threading.Timer(delay, _release)
+    timer.daemon = True
+    timer.start()
+
+
+async def resolve_preview_media(
+    upload: Optional[UploadFile], digest: Optional[str]
+) -> Optional[StoredMedia]:
+    if upload:
+        return await media_store.ingest(upload)
+    if not digest:
+        return None
+    try:
+        path = media_store.acquire(digest)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Media not found.") from exc
+    return StoredMedia(sha256=digest, path=path, size=path.stat().st_size, filename=path.name)
+
+
+def render_preview_media(
+    preview_id: str,
+    input_path: Path,
+    settings: RenderSettings,
+    logo_path: Optional[Path],
+    audio_path: Optional[Path],
+    start: float,
+    duration: float,
+    height: int,
+    frames: int,
+) -> RenderPreviewResponse:
     temp_dir = get_temp_dir()
-    file_path = temp_dir / Path(file_name).name
-    return FileResponse(path=file_path, filename=file_path.name, media_type="video/mp4")
+    info = probe_media(input_path)
+    # Freeze holds replace frames, so the output is as long as the retimed source.
+    output_duration = info.duration / settings.video_speed
+    if not 0 <= start < output_duration:
+        raise HTTPException(
+            status_code=400,
+            detail=f"start must be within the output (0 to {output_duration:.2f}s).",
+        )
+    duration = min(duration, output_duration - start)
+    if frames:
+        end = start + duration
+        times = [start + (end - start) * (index + 0.5) / frames for index in range(frames)]
+        time_map = freeze_time_map(output_freeze_spans(info, settings))
+        times = [time_map(time) for time in times]
+        frame_paths = [
+            temp_dir / f"preview_{preview_id}_{index:02d}.jpg" for index in range(frames)
+        ]
+        frame_paths = render_preview_frames(
+            input_path, frame_paths, times, settings, logo_path, max_height=height
+        )
+        schedule_preview_cleanup(frame_paths)
+        if not frame_paths:
+            raise FFmpegRenderError("No preview frames were rendered.")
+        return RenderPreviewResponse(
+            frame_urls=[f"/download/{path.name}" for path in frame_paths],
+            aspect_ratio=settings.aspect_ratio,
+        )
+
+    output_path = temp_dir / f"preview_{preview_id}.mp4"
+    render_ffmpeg_pipeline(
+        input_path,
+        output_path,
+        settings,
+        logo_path,
+        audio_path,
+        window=(start, duration),
+        max_height=height,
+    )
+    schedule_preview_cleanup([output_path])
+    return RenderPreviewResponse(
+        output_url=f"/download/{output_path.name}",
+        aspect_ratio=settings.aspect_ratio,
+    )
+
+
+@app.post("/render/preview", response_model=RenderPreviewResponse)
+async def render_preview(
+    video: UploadFile | None = File(None),
+    audio: UploadFile | None = File(None),
+    logo: UploadFile | None = File(None),
+    video_sha256: str | None = Form(None),
+    audio_sha256: str | None = Form(None),
+    logo_sha256: str | None = Form(None),
+    settings: str = Form(...),
+    start: float = Form(0.0, ge=0),
+    duration: float = Form(5.0, gt=0, le=30),
+    height: int = Form(PREVIEW_MAX_HEIGHT, ge=144, le=1080),
+    frames: int = Form(0, ge=0, le=12),
+):
+    """
+    Render a fast low-resolution preview with the same pipeline as /render.
+
+    - start/duration: window on the output timeline (seconds)
+    - height: preview frame height; geometry scales with the frame
+    - frames: when > 0, return that many still frames instead of a clip
+    - video_sha256/logo_sha256/audio_sha256: reuse media stored by an earlier
+      request instead of uploading it again
+    """
+    parsed_settings = RenderSettings.model_validate_json(settings)
+    if not video and not video_sha256:
+        raise HTTPException(status_code=400, detail="Provide video or video_sha256.")
+    resolved: list[Optional[StoredMedia]] = []
+    try:
+        for upload, digest in ((video, video_sha256), (logo, logo_sha256), (audio, audio_sha256)):
+            resolved.append(await resolve_preview_media(upload, digest))
+    except BaseException:
+        for media in resolved:
+            if media:
+                media_store.release(media.sha256)
+        raise
+    source, stored_logo, stored_audio = resolved
+    try:
+        preview = await run_in_threadpool(
+            render_preview_media,
+            uuid4().hex,
+            source.path,
+            parsed_settings,
+            stored_logo.path if stored_logo else None,
+            stored_audio.path if stored_audio else None,
+            start,
+            duration,
+            height,
+            frames,
+        )
+    except FFmpegRenderError as exc:
+        logger.exception("Preview render failed for %s", source.filename)
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    finally:
+        schedule_preview_release([media.sha256 for media in resolved if media])
+    return preview.model_copy(
+        update={
+            "video_sha256": source.sha256,
+            "logo_sha256": stored_logo.sha256 if stored_logo else None,
+            "audio_sha256": stored_audio.sha256 if stored_audio else None,
+        }
+    )
+
+
+@app.api_route("/render/stream/{job_id}/{file_name}", methods=["GET", "HEAD"])
+def render_stream(request: Request, job_id: str, file_name: str):
+    """Serve the HLS playlist and fMP4 segments of a progressive render."""
+    job = render_job_store.get(job_id)
+    if not job or not job.get("hls_dir"):
+        raise HTTPException(status_code=404, detail="Stream not found.")
+    file_path = Path(job["hls_dir"]) / Path(file_name).name
+    if file_path.suffix.lower() not in (".m3u8", ".m4s", ".mp4"):
+        raise HTTPException(status_code=404, detail="Stream file not available yet.")
+    if file_path.suffix.lower() == ".m3u8":
+        # The playlist grows until the render ends; segments never change.
+        cache_control = "no-cache" if job["status"] != "completed" else DEFAULT_CACHE_CONTROL
+    else:
+        cache_control = "public, max-age=31536000, immutable"
+    return serve_file(request, file_path, cache_control=cache_control)
+
+
+@app.api_route("/download/{file_name}", methods=["GET", "HEAD"])
+def download_render(request: Request, file_name: str):
+    file_path = get_temp_dir() / Path(file_name).name
+    return serve_file(request, file_path, filename=file_path.name)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import numpy as np
+
+from backend.features.caption_overlay import CaptionBitmap, CaptionOverlay
+
+
+def solid(start: float, end: float, x: int, y: int, size: int, color, alpha: int = 255):
+    rgba = np.zeros((size, size, 4), dtype=np.uint8)
+    rgba[:, :, :3] = color
+    rgba[:, :, 3] = alpha
+    return CaptionBitmap.from_rgba(rgba, start, end, x, y)
+
+
+def test_from_rgba_trims_transparent_padding():
+    rgba = np.zeros((10, 10, 4), dtype=np.uint8)
+    rgba[2:5, 3:7] = (255, 255, 255, 255)
+
+    bitmap = CaptionBitmap.from_rgba(rgba, 0.0, 1.0, 100, 50)
+
+    assert (bitmap.x, bitmap.y) == (103, 52)
+    assert bitmap.rgb.shape == (3, 4, 3)
+    assert bitmap.alpha.shape == (3, 4, 1)
+
+
+def test_from_rgba_drops_fully_transparent_captions():
+    assert CaptionBitmap.from_rgba(np.zeros((4, 4, 4), dtype=np.uint8), 0, 1, 0, 0) is None
+
+
+def test_overlapping_captions_are_split_into_segments():
+    overlay = CaptionOverlay(
+        [solid(0.0, 2.0, 0, 0, 2, (255, 0, 0)), solid(1.0, 3.0, 0, 0, 2, (0, 255, 0))]
+    )
+
+    assert overlay.starts == [0.0, 1.0, 2.0]
+    assert overlay.ends == [1.0, 2.0, 3.0]
+    assert overlay.active == [[0], [0, 1], [1]]
+
+
+def test_segment_lookup_handles_sequential_frames_and_seeks():
+    overlay = CaptionOverlay(
+        [solid(start, start + 1.0, 0, 0, 2, (255, 255, 255)) for start in (0.0, 2.0, 4.0)]
+    )
+
+    assert overlay.segment_at(-0.1) is None
+    assert [overlay.segment_at(t) for t in (0.0, 0.5, 1.5, 2.5)] == [0, 0, 1, 2]
+    # Seeking backwards falls back to a binary search.
+    assert overlay.segment_at(0.2) == 0
+    assert overlay.segment_at(4.5) == 4
+    assert overlay.segment_at(5.0) is None
+
+
+def test_apply_blends_visible_captions_only():
+    overlay = CaptionOverlay([solid(1.0, 2.0, 2, 2, 2, (255, 0, 0))])
+    frame = np.zeros((6, 6, 3), dtype=np.uint8)
+
+    assert overlay.apply(frame, 0.5) is frame
+    assert not frame.any()
+
+    blended = overlay.apply(frame, 1.5)
+    assert (blended[2:4, 2:4] == (255, 0, 0)).all()
+    assert blended.sum() == 4 * 255
+
+
+def test_apply_uses_alpha_and_copies_read_only_frames():
+    overlay = CaptionOverlay([solid(0.0, 1.0, 0, 0, 2, (255, 255, 255), alpha=128)])
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    frame.flags.writeable = False
+
+    blended = overlay.apply(frame, 0.5)
+
+    assert blended is not frame
+    assert not frame.any()
+    assert (blended[:2, :2] == 128).all()
+
+
+def test_apply_clips_captions_that_overhang_the_frame():
+    overlay = CaptionOverlay([solid(0.0, 1.0, -1, 3, 2, (0, 0, 255))])
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    blended = overlay.apply(frame, 0.5)
+
+    assert (blended[3, 0] == (0, 0, 255)).all()
+    assert blended.sum() == 255
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from backend.features.caption_ass import AssEvent
+from backend.features.caption_splice import SpliceSpan, changed_ranges, plan_splice
+
+KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 8.0]
+
+
+def spans(*bounds: tuple[float, float, bool]) -> list[SpliceSpan]:
+    return [SpliceSpan(start=start, end=end, reencode=reencode) for start, end, reencode in bounds]
+
+
+def test_unchanged_events_produce_no_ranges():
+    events = [AssEvent(start=0, end=1, lines=["a"]), AssEvent(start=2, end=3, lines=["b"])]
+
+    assert changed_ranges(events, [event.model_copy() for event in events]) == []
+
+
+def test_edited_and_moved_events_cover_old_and_new_times():
+    previous = [AssEvent(start=0, end=1, lines=["a"]), AssEvent(start=2, end=3, lines=["b"])]
+    current = [AssEvent(start=0, end=1, lines=["a2"]), AssEvent(start=5, end=6, lines=["b"])]
+
+    assert set(changed_ranges(previous, current)) == {(0, 1), (2, 3), (5, 6)}
+
+
+def test_changed_range_is_widened_to_its_gop():
+    assert plan_splice([(4.5, 5.0)], KEYFRAMES, 10.0) == spans(
+        (0.0, 4.0, False), (4.0, 6.0, True), (6.0, 10.0, False)
+    )
+
+
+def test_range_ending_on_a_keyframe_does_not_take_the_next_gop():
+    assert plan_splice([(4.0, 6.0)], KEYFRAMES, 10.0) == spans(
+        (0.0, 4.0, False), (4.0, 6.0, True), (6.0, 10.0, False)
+    )
+
+
+def test_ranges_sharing_a_gop_are_merged():
+    assert plan_splice([(2.5, 3.0), (3.5, 4.5)], KEYFRAMES, 10.0) == spans(
+        (0.0, 2.0, False), (2.0, 6.0, True), (6.0, 10.0, False)
+    )
+
+
+def test_last_gop_runs_to_the_end_of_the_output():
+    assert plan_splice([(9.0, 9.5)], KEYFRAMES, 10.0) == spans(
+        (0.0, 8.0, False), (8.0, 10.0, True)
+    )
+
+
+def test_ranges_outside_the_output_copy_everything():
+    assert plan_splice([(12.0, 13.0)], KEYFRAMES, 10.0) == spans((0.0, 10.0, False))
+
+
+def test_large_edits_fall_back_to_a_full_render():
+    assert plan_splice([(0.5, 6.5)], KEYFRAMES, 10.0) is None
+
+
+def test_missing_keyframes_or_duration_fall_back_to_a_full_render():
+    assert plan_splice([(1.0, 2.0)], [], 10.0) is None
+    assert plan_splice([(1.0, 2.0)], KEYFRAMES, 0.0) is None
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+from PIL import Image, ImageDraw
+
+from backend.features.captioner import (
+    is_myanmar_text,
+    resolve_font,
+    split_graphemes,
+    wrap_text_myanmar,
+)
+
+FONT_SIZE = 48
+SAMPLES = [
+    "မင်္ဂလာပါ ခင်ဗျာ ဒီနေ့ ရုပ်ရှင် အကြောင်း ပြောပြပါမယ်",
+    "သူက အိမ်ကို ပြန်လာပြီး တံခါးကို ပိတ်လိုက်တယ်",
+    "ကျွန်တော် နားမလည်ဘူး ဘာဖြစ်လို့ ဒီလို လုပ်ရတာလဲ",
+    "The hero finally returns home after ten long years",
+    "Short line",
+]
+
+
+def reference_wrap(text: str, font_size: int, max_width: int) -> list[str]:
+    """The wrapper before cached advances: re-measures the whole line per token."""
+    font = resolve_font(font_size)
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    if not text:
+        return [""]
+
+    words = text.split()
+    myanmar = is_myanmar_text(text)
+    if myanmar:
+        tokens: list[str] = []
+        for word in words:
+            tokens.extend(split_graphemes(word))
+            tokens.append(" ")
+        if tokens:
+            tokens.pop()
+    else:
+        tokens = words if words else list(text)
+
+    lines: list[str] = []
+    current = ""
+    for token in tokens:
+        if myanmar or token == " ":
+            candidate = f"{current}{token}"
+        else:
+            candidate = f"{current} {token}".strip()
+        width = draw.textbbox((0, 0), candidate, font=font)[2]
+        if width <= max_width or not current:
+            current = candidate
+        else:
+            lines.append(current)
+            current = token.strip()
+
+    if current:
+        lines.append(current)
+
+    return lines
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+@pytest.mark.parametrize("max_width", [300, 600, 1000])
+def test_wrap_matches_whole_line_measurement(text: str, max_width: int):
+    assert wrap_text_myanmar(text, FONT_SIZE, max_width) == reference_wrap(
+        text, FONT_SIZE, max_width
+    )
+
+
+def test_wrapped_lines_keep_every_character():
+    text = SAMPLES[0]
+    lines = wrap_text_myanmar(text, FONT_SIZE, 300)
+
+    assert len(lines) > 1
+    assert "".join(lines).replace(" ", "") == text.replace(" ", "")
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.features.freeze_frames import freeze_keyframe_times, freeze_spans, freeze_time_map
+
+
+def test_spans_hold_every_interval_until_the_end():
+    assert freeze_spans(20, 8, 3, 30) == [(8.0, 11.0), (16.0, 19.0)]
+
+
+def test_spans_are_snapped_to_the_frame_grid():
+    spans = freeze_spans(5, 1.01, 0.5, 24)
+
+    for start, end in spans:
+        assert start * 24 == pytest.approx(round(start * 24))
+        assert end * 24 == pytest.approx(round(end * 24))
+
+
+def test_holds_longer_than_the_interval_do_not_overlap():
+    spans = freeze_spans(10, 4, 6, 25)
+
+    assert spans == [(4.0, 8.0), (8.0, 10.0)]
+    assert all(end <= next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+
+
+def test_spans_are_clamped_to_the_duration():
+    assert freeze_spans(9.5, 8, 3, 30) == [(8.0, 9.5)]
+    assert freeze_spans(0, 8, 3, 30) == []
+
+
+def test_keyframes_fall_on_every_span_boundary():
+    assert freeze_keyframe_times([(8.0, 11.0), (16.0, 19.0)]) == [8.0, 11.0, 16.0, 19.0]
+
+
+def test_time_map_holds_the_first_frame_of_each_span():
+    time_map = freeze_time_map([(8.0, 11.0), (16.0, 19.0)])
+
+    assert time_map(0.0) == 0.0
+    assert time_map(7.99) == 7.99
+    assert time_map(8.0) == 8.0
+    assert time_map(10.5) == 8.0
+    assert time_map(11.0) == 11.0
+    assert time_map(17.0) == 16.0
+    assert time_map(19.5) == 19.5
+
+
+def test_time_map_without_spans_is_identity():
+    assert freeze_time_map([])(3.2) == 3.2
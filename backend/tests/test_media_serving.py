@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app, get_temp_dir
+
+PAYLOAD = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def output_file():
+    path = get_temp_dir() / "rendered_test_media_serving.mp4"
+    path.write_bytes(PAYLOAD)
+    yield path
+    path.unlink(missing_ok=True)
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_head_returns_headers_without_body(client, output_file: Path):
+    response = client.head(f"/download/{output_file.name}")
+
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(PAYLOAD))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"]
+    assert response.content == b""
+
+
+def test_head_range_returns_partial_headers_without_body(client, output_file: Path):
+    response = client.head(f"/download/{output_file.name}", headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-19/{len(PAYLOAD)}"
+    assert response.headers["content-length"] == "10"
+    assert response.content == b""
+
+
+def test_range_returns_requested_bytes(client, output_file: Path):
+    response = client.get(f"/download/{output_file.name}", headers={"Range": "bytes=-5"})
+
+    assert response.status_code == 206
+    assert response.content == PAYLOAD[-5:]
+
+
+def test_matching_etag_returns_not_modified(client, output_file: Path):
+    etag = client.get(f"/download/{output_file.name}").headers["etag"]
+
+    response = client.get(f"/download/{output_file.name}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_range_past_the_end_is_not_satisfiable(client, output_file: Path):
+    response = client.get(
+        f"/download/{output_file.name}", headers={"Range": f"bytes={len(PAYLOAD)}-"}
+    )
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(PAYLOAD)}"
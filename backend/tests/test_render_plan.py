@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from backend.features.render_plan import MediaInfo, atempo_chain, compile_render_plan
+from backend.features.render_settings import AspectRatio, RenderSettings
+
+
+def landscape(**overrides) -> MediaInfo:
+    info = dict(
+        width=1280,
+        height=720,
+        fps=30,
+        duration=20,
+        has_audio=True,
+        video_codec="h264",
+        pix_fmt="yuv420p",
+        audio_codec="aac",
+    )
+    info.update(overrides)
+    return MediaInfo(**info)
+
+
+def portrait(**overrides) -> MediaInfo:
+    return landscape(width=720, height=1280, **overrides)
+
+
+def passthrough(**overrides) -> RenderSettings:
+    settings = dict(filmstrip_enabled=False, freeze_frame_enabled=False)
+    settings.update(overrides)
+    return RenderSettings(**settings)
+
+
+def test_speed_up_retimes_between_crop_and_scale():
+    plan = compile_render_plan(RenderSettings(video_speed=2.0), landscape(), True, max_height=360)
+
+    assert plan.stages == ["crop", "speed", "scale", "filmstrip", "logo"]
+    assert plan.crop == (404, 720, 438, 0)
+    assert plan.scale == (202, 360)
+    assert (plan.width, plan.height) == (202, 360)
+
+
+def test_slow_down_retimes_after_scale():
+    plan = compile_render_plan(RenderSettings(video_speed=0.5), landscape(), False, max_height=360)
+
+    assert plan.stages == ["crop", "scale", "speed", "filmstrip"]
+
+
+def test_filmstrip_and_logo_use_the_scaled_frame():
+    full = compile_render_plan(RenderSettings(), landscape(), True)
+    preview = compile_render_plan(RenderSettings(), landscape(), True, max_height=360)
+
+    assert full.stages == ["crop", "filmstrip", "logo"]
+    assert full.filmstrip == (576, 108, 2)
+    # Geometry follows the 360 px frame and the blur radius shrinks with it.
+    assert preview.filmstrip == (288, 54, 1)
+    assert preview.logo.height == int(360 * 0.12)
+    assert preview.logo.margin == int(360 * 0.03)
+
+
+def test_filmstrip_is_skipped_for_landscape_outputs():
+    plan = compile_render_plan(
+        RenderSettings(aspect_ratio=AspectRatio.youtube), landscape(), False
+    )
+
+    assert plan.stages == []
+    assert plan.filmstrip is None
+
+
+def test_identity_render_copies_h264_video_and_aac_audio():
+    plan = compile_render_plan(passthrough(), portrait(), False)
+
+    assert plan.stages == []
+    assert plan.copy_video
+    assert plan.copy_audio
+    assert "video: stream copy" in plan.describe()
+
+
+@pytest.mark.parametrize(
+    "settings, info, has_logo",
+    [
+        (passthrough(), portrait(video_codec="hevc"), False),
+        (passthrough(), portrait(pix_fmt="yuv444p"), False),
+        (passthrough(), portrait(), True),
+        (passthrough(video_speed=1.5), portrait(), False),
+        (passthrough(filmstrip_enabled=True), portrait(), False),
+        (passthrough(), landscape(), False),
+    ],
+)
+def test_video_is_reencoded_when_any_stage_applies(settings, info, has_logo):
+    assert not compile_render_plan(settings, info, has_logo).copy_video
+
+
+@pytest.mark.parametrize(
+    "settings, info, external_audio",
+    [
+        (passthrough(audio_speed=1.5), portrait(), False),
+        (passthrough(), portrait(audio_codec="mp3"), False),
+        (passthrough(), portrait(has_audio=False, audio_codec=None), False),
+        (passthrough(), portrait(), True),
+    ],
+)
+def test_audio_is_copied_only_from_aac_sources_at_unit_speed(settings, info, external_audio):
+    plan = compile_render_plan(settings, info, False, external_audio=external_audio)
+
+    assert not plan.copy_audio
+
+
+def test_audio_speed_does_not_affect_video_copy():
+    plan = compile_render_plan(passthrough(audio_speed=1.5), portrait(), False)
+
+    assert plan.copy_video
+    assert plan.audio_tempo == ["atempo=1.500000"]
+
+
+@pytest.mark.parametrize("speed", [0.25, 0.3, 0.5, 0.75, 1.5, 2.0, 3.0, 4.0, 5.0])
+def test_atempo_chain_multiplies_to_the_speed_within_filter_limits(speed: float):
+    factors = [float(step.split("=")[1]) for step in atempo_chain(speed)]
+
+    assert all(0.5 <= factor <= 2.0 for factor in factors)
+    assert math.prod(factors) == pytest.approx(speed)
+
+
+def test_atempo_chain_is_empty_at_unit_speed():
+    assert atempo_chain(1.0) == []
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.features import whisper_batching
+from backend.features.whisper_batching import TranscribeOptions, WhisperBatchScheduler
+
+
+class FakeModel:
+    def __init__(self, name: str, calls: list[str]) -> None:
+        self.name = name
+        self.calls = calls
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(self.name)
+        segment = SimpleNamespace(start=0.0, end=len(audio) / 16000, text=self.name)
+        return iter([segment]), SimpleNamespace(language=kwargs.get("language") or "my")
+
+
+class StubModelManager:
+    """Keeps only one idle model resident, like a budget that fits one model."""
+
+    def __init__(self) -> None:
+        self.loads: list[str] = []
+        self.calls: list[str] = []
+        self.refs: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, model_name: str):
+        with self._lock:
+            if model_name not in self.refs:
+                for idle in [name for name, refs in self.refs.items() if refs == 0]:
+                    del self.refs[idle]
+                self.loads.append(model_name)
+                self.refs[model_name] = 0
+            self.refs[model_name] += 1
+        try:
+            yield FakeModel(model_name, self.calls)
+        finally:
+            with self._lock:
+                self.refs[model_name] -= 1
+
+
+@pytest.fixture(autouse=True)
+def one_second_windows(monkeypatch):
+    monkeypatch.setattr(whisper_batching, "get_speech_timestamps", None)
+    monkeypatch.setattr(whisper_batching, "WHISPER_WINDOW_SECONDS", 1)
+
+
+def run_jobs(scheduler, jobs):
+    results = {}
+
+    def run(model_name, seconds):
+        audio = np.zeros(seconds * 16000, dtype=np.float32)
+        results[model_name] = scheduler.transcribe(
+            model_name, audio, TranscribeOptions(language="my")
+        )
+
+    threads = [threading.Thread(target=run, args=job) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    return results
+
+
+def test_concurrent_jobs_load_each_model_once():
+    manager = StubModelManager()
+    scheduler = WhisperBatchScheduler(manager, batch_size=4, batch_wait=0)
+
+    results = run_jobs(scheduler, [("large-v3", 40), ("medium", 40)])
+
+    assert sorted(manager.loads) == ["large-v3", "medium"]
+    for model_name in ("large-v3", "medium"):
+        segments, language = results[model_name]
+        assert language == "my"
+        assert [segment.start for segment in segments] == [float(i) for i in range(40)]
+        assert all(segment.text == model_name for segment in segments)
+
+
+def test_batches_stay_on_one_model_until_its_jobs_run_dry():
+    manager = StubModelManager()
+    scheduler = WhisperBatchScheduler(manager, batch_size=4, batch_wait=0)
+
+    run_jobs(scheduler, [("large-v3", 20), ("medium", 20)])
+
+    switches = sum(1 for prev, cur in zip(manager.calls, manager.calls[1:]) if prev != cur)
+    assert len(manager.calls) == 40
+    assert switches == 1
+
+
+def test_windows_are_shifted_onto_the_job_timeline():
+    manager = StubModelManager()
+    scheduler = WhisperBatchScheduler(manager, batch_size=2, batch_wait=0)
+    audio = np.zeros(int(2.5 * 16000), dtype=np.float32)
+
+    segments, _ = scheduler.transcribe("small", audio, TranscribeOptions(language="my"))
+
+    assert [(segment.start, segment.end) for segment in segments] == [
+        (0.0, 1.0),
+        (1.0, 2.0),
+        (2.0, 2.5),
+    ]
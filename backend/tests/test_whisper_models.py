@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.features import whisper_batching, whisper_models
+from backend.features.whisper_batching import TranscribeOptions, WhisperBatchScheduler
+from backend.features.whisper_models import WhisperModelManager
+
+loads: list[str] = []
+
+
+class FakeWhisperModel:
+    release = threading.Event()
+
+    def __init__(self, model_size: str, **kwargs) -> None:
+        self.model_size = model_size
+        loads.append(model_size)
+
+    def transcribe(self, audio, **kwargs):
+        # The job's second window waits so the test can act mid-transcription.
+        if len(audio) < 16000:
+            FakeWhisperModel.release.wait(timeout=10)
+        segment = SimpleNamespace(start=0.0, end=len(audio) / 16000, text="hi")
+        return iter([segment]), SimpleNamespace(language="my")
+
+
+@pytest.fixture(autouse=True)
+def fake_whisper(monkeypatch):
+    loads.clear()
+    FakeWhisperModel.release.clear()
+    monkeypatch.setattr(whisper_models, "WhisperModel", FakeWhisperModel)
+    monkeypatch.setattr(whisper_models, "get_whisper_device", lambda: "cpu")
+    monkeypatch.setattr(whisper_models, "process_rss", lambda: None)
+    monkeypatch.setattr(whisper_batching, "get_speech_timestamps", None)
+    monkeypatch.setattr(whisper_batching, "WHISPER_WINDOW_SECONDS", 1)
+
+
+def loaded(manager: WhisperModelManager) -> dict[str, int]:
+    return {status.model: status.in_use for status in manager.status()}
+
+
+def test_idle_models_are_evicted_least_recently_used_first():
+    small = whisper_models.estimate_model_bytes("small", "float32")
+    large = whisper_models.estimate_model_bytes("large-v2", "float32")
+    manager = WhisperModelManager(budget_bytes=small + large)
+
+    for model_size in ("small", "large-v2", "small", "large-v3"):
+        with manager.acquire(model_size):
+            pass
+
+    assert loads == ["small", "large-v2", "large-v3"]
+    assert loaded(manager) == {"small": 0, "large-v3": 0}
+
+
+def test_model_is_not_evicted_while_a_job_uses_it():
+    # A budget of one byte evicts every model as soon as nothing references it.
+    manager = WhisperModelManager(budget_bytes=1)
+    scheduler = WhisperBatchScheduler(manager, batch_size=1, batch_wait=0)
+    audio = np.zeros(int(1.5 * 16000), dtype=np.float32)
+    result = {}
+
+    job = threading.Thread(
+        target=lambda: result.update(
+            segments=scheduler.transcribe("small", audio, TranscribeOptions(language="my"))[0]
+        )
+    )
+    job.start()
+    try:
+        # Between the job's windows, another model is loaded and released.
+        for _ in range(100):
+            if loaded(manager).get("small") == 1 and loads == ["small"]:
+                break
+            threading.Event().wait(0.01)
+        with manager.acquire("medium"):
+            pass
+        assert loaded(manager) == {"small": 1}
+    finally:
+        FakeWhisperModel.release.set()
+        job.join(timeout=10)
+
+    assert len(result["segments"]) == 2
+    assert loads == ["small", "medium"]
+    assert loaded(manager) == {}
@@ -122,19 +122,62 @@ export default function VideoRecapSettingsPage() {
         throw new Error(errorText || "Render failed.");
       }
 
-      const data = (await response.json()) as {
-        output_url: string;
-      };
+      const data = (await response.json()) as { job_id: string };
+      setStatus("Rendering...");
+
+      const pollInterval = window.setInterval(async () => {
+        try {
+          const statusResponse = await fetch(
+            `${apiBaseUrl}/render/status/${data.job_id}`
+          );
+          if (!statusResponse.ok) {
+            const errorText = await statusResponse.text();
+            throw new Error(errorText || "Failed to fetch status.");
+          }
+
+          const statusData = (await statusResponse.json()) as {
+            status: string;
+            progress: number;
+            output_url?: string | null;
+            error?: string | null;
+          };
+
+          setProgress(Math.max(20, statusData.progress ?? 0));
+          if (statusData.status === "completed" && statusData.output_url) {
+            setProgress(100);
+            setStatus("Render complete.");
+            setDownloadUrl(`${apiBaseUrl}${statusData.output_url}`);
+            setIsRendering(false);
+            window.clearInterval(pollInterval);
+          }
 
-      setProgress(100);
-      setStatus("Render complete.");
-      setDownloadUrl(`${apiBaseUrl}${data.output_url}`);
+          if (
+            statusData.status === "failed" ||
+            statusData.status === "cancelled"
+          ) {
+            setErrorMessage(statusData.error || "Render failed.");
+            setStatus(
+              statusData.status === "cancelled"
+                ? "Render cancelled."
+                : "Render failed."
+            );
+            setIsRendering(false);
+            window.clearInterval(pollInterval);
+          }
+        } catch (error) {
+          const message =
+            error instanceof Error ? error.message : "Unexpected render error.";
+          setErrorMessage(message);
+          setStatus("Render failed.");
+          setIsRendering(false);
+          window.clearInterval(pollInterval);
+        }
+      }, 2000);
     } catch (error) {
       const message =
         error instanceof Error ? error.message : "Unexpected render error.";
       setErrorMessage(message);
       setStatus("Render failed.");
-    } finally {
       setIsRendering(false);
     }
   };